@@ -9,7 +9,6 @@ import argparse
 import json
 import logging
 import getpass
-import difflib
 
 from . import get_project, init_project
 from . import __version__
@@ -19,6 +18,7 @@ from .common import six
 from .common.crypt import get_crypt_context, parse_pwhash, get_keyring
 from .contrib.utility import query_yes_no, prompt_password
 from .errors import DestinationExistsError
+from .contrib.project import _find_close_ids
 try:
     from .common.host import get_database, get_credentials, make_uri
 except ImportError:
@@ -100,10 +100,7 @@ def _update_password(config, hostname, scheme=None, new_pw=None):
 
 
 def _read_index(project, fn_index=None):
-    if fn_index is None:
-        _print_err("Indexing project...")
-        return project.index()
-    else:
+    if fn_index is not None:
         _print_err("Reading index from file '{}'...".format(fn_index))
         fd = open(fn_index)
         return (json.loads(l) for l in fd)
@@ -114,8 +111,7 @@ def _open_job_by_id(project, job_id):
     try:
         return project.open_job(id=job_id)
     except KeyError as error:
-        close_matches = difflib.get_close_matches(
-            job_id, [jid[:len(job_id)] for jid in project.find_job_ids()])
+        close_matches = _find_close_ids(project._get_job_ids(), job_id)
         msg = "Did not find job corresponding to id '{}'.".format(job_id)
         if len(close_matches) == 1:
             msg += " Did you mean '{}'?".format(close_matches[0])
@@ -164,7 +160,7 @@ def main_statepoint(args):
         if not m.match(job_id):
             raise ValueError(
                 "'{}' is not a valid job id!".format(job_id))
-        print(json.dumps(_open_job_id(project, job_id).statepoint(), indent=args.indent))
+        print(json.dumps(_open_job_by_id(project, job_id).statepoint(), indent=args.indent))
 
 
 def main_move(args):
@@ -218,6 +214,19 @@ def main_find(args):
         print(job_id)
 
 
+def main_export_statepoints(args):
+    project = get_project()
+    f = None if args.filter is None else json.loads(args.filter)
+    df = None if args.doc_filter is None else json.loads(args.doc_filter)
+    project.export_statepoints(
+        fn=args.filename,
+        keys=args.keys,
+        doc_keys=args.doc_keys,
+        filter=f,
+        doc_filter=df,
+        format=args.format)
+
+
 def main_view(args):
     project = get_project()
     index = _read_index(project, args.index)
@@ -227,6 +236,12 @@ def main_view(args):
         index=index)
 
 
+def main_update_cache(args):
+    project = get_project()
+    _print_err("Updating state point cache...")
+    project.update_cache()
+
+
 def main_init(args):
     init_project(
         name=args.project_id,
@@ -608,7 +623,8 @@ def main():
         'filter',
         type=str,
         nargs='?',
-        help="A JSON encoded filter (key-value pairs).")
+        help="A JSON encoded filter (key-value pairs). Supports the "
+             "$gt, $gte, $lt, $lte, $in, $ne and $exists operators.")
     parser_find.add_argument(
         '-i', '--index',
         type=str,
@@ -619,6 +635,41 @@ def main():
         help="A JSON encoded filter for job documents (key-value pairs).")
     parser_find.set_defaults(func=main_find)
 
+    parser_export_statepoints = subparsers.add_parser(
+        'export-statepoints',
+        description="Export the state points and job document values of "
+                    "the project's jobs as typed binary columns.")
+    parser_export_statepoints.add_argument(
+        'filename',
+        type=str,
+        help="The filename of the table.")
+    parser_export_statepoints.add_argument(
+        '--format',
+        type=str,
+        choices=['npz', 'npy'],
+        default='npz',
+        help="The table format. The npy format stores each column in a "
+             "separate file within a directory.")
+    parser_export_statepoints.add_argument(
+        '-k', '--keys',
+        type=str,
+        nargs='+',
+        help="The dotted state point keys to export, defaults to all keys.")
+    parser_export_statepoints.add_argument(
+        '--doc-keys',
+        type=str,
+        nargs='+',
+        help="The dotted job document keys to export.")
+    parser_export_statepoints.add_argument(
+        '-f', '--filter',
+        type=str,
+        help="A JSON encoded state point filter (key-value pairs).")
+    parser_export_statepoints.add_argument(
+        '-d', '--doc-filter',
+        type=str,
+        help="A JSON encoded filter for job documents (key-value pairs).")
+    parser_export_statepoints.set_defaults(func=main_export_statepoints)
+
     parser_view = subparsers.add_parser('view')
     parser_view.add_argument(
         'prefix',
@@ -637,6 +688,11 @@ def main():
         help="The filename of an index file.")
     parser_view.set_defaults(func=main_view)
 
+    parser_update_cache = subparsers.add_parser(
+        'update-cache',
+        description="Update the persistent state point cache of the project.")
+    parser_update_cache.set_defaults(func=main_update_cache)
+
     parser_config = subparsers.add_parser('config')
     parser_config.add_argument(
         '-g', '--global',
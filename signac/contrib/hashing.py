@@ -3,11 +3,37 @@
 # This software is licensed under the BSD 3-Clause License.
 import hashlib
 import json
+from multiprocessing import Pool
+
+# The encoder is equivalent to json.dumps(spec, sort_keys=True), but
+# json.dumps() creates a new encoder on every call with non-default arguments.
+_ENCODER = json.JSONEncoder(sort_keys=True)
 
 
 def calc_id(spec):
     "Calculate and return a hash value for the given spec."
-    blob = json.dumps(spec, sort_keys=True)
-    m = hashlib.md5()
-    m.update(blob.encode())
-    return m.hexdigest()
+    return hashlib.md5(_ENCODER.encode(spec).encode()).hexdigest()
+
+
+def calc_ids(specs, processes=None):
+    """Calculate and return the hash values for all specs.
+
+    :param specs: The specs to calculate the hash values for.
+    :type specs: iterable
+    :param processes: The number of processes used to calculate
+        the hash values. By default, all values are calculated
+        within the current process.
+    :type processes: int
+    :returns: The hash values in the order of the specs.
+    :rtype: list
+    """
+    if processes is not None and processes > 1:
+        specs = list(specs)
+        pool = Pool(processes)
+        try:
+            chunksize = max(1, min(10000, len(specs) // (4 * processes)))
+            return pool.map(calc_id, specs, chunksize)
+        finally:
+            pool.terminate()
+    else:
+        return [calc_id(spec) for spec in specs]
@@ -9,11 +9,16 @@ import hashlib
 import logging
 import warnings
 import errno
-from time import sleep
+import uuid
+import functools
+from collections import deque
+from time import sleep, time
+from multiprocessing import Pool
+from multiprocessing.pool import ThreadPool
 
 from ..common import six
 from ..common import errors
-from .utility import walkdepth, is_string
+from .utility import walkdepth, is_string, _is_stable_mtime, _list_job_dirs
 from .hashing import calc_id
 
 if six.PY2:
@@ -32,16 +37,36 @@ KEY_LINK = 'signac_link'
 KEY_CRAWLER_PATH = 'access_crawler_root'
 KEY_CRAWLER_MODULE = 'access_module'
 KEY_CRAWLER_ID = 'access_crawler_id'
+KEY_TOMBSTONE = 'signac_tombstone'
+KEY_HASH_ALGORITHM = 'hash_algorithm'
+
+# Large chunks reduce the number of system calls and allow hashlib to
+# release the GIL while hashing, so that files are hashed in parallel.
+_HASH_CHUNK_SIZE = 2**20
 
 
 def md5(file):
     "Calculate and return the md5 hash value for the file data."
-    m = hashlib.md5()
-    for chunk in iter(lambda: file.read(4096), b''):
+    return _file_hash(file, 'md5')
+
+
+def _file_hash(file, algorithm):
+    "Calculate and return the hash value for the file data."
+    m = hashlib.new(algorithm)
+    for chunk in iter(lambda: file.read(_HASH_CHUNK_SIZE), b''):
         m.update(chunk)
     return m.hexdigest()
 
 
+def _resolve_file_id(doc):
+    "Compute the deferred file id of doc in place."
+    if 'file_id' in doc and doc['file_id'] is None:
+        algorithm = doc.pop(KEY_HASH_ALGORITHM, 'md5')
+        with open(os.path.join(doc[KEY_PATH], doc[KEY_FILENAME]), 'rb') as file:
+            doc['file_id'] = doc[algorithm] = _file_hash(file, algorithm)
+    return doc
+
+
 class BaseCrawler(object):
     """Crawl through `root` and index all files.
 
@@ -85,7 +110,35 @@ class BaseCrawler(object):
         m.update(blob.encode('utf-8'))
         return m.hexdigest()
 
-    def crawl(self, depth=0):
+    def _docs_from_files(self, depth, workers=None):
+        """Yield the dirpath, fn and list of docs for all files.
+
+        The directory tree is walked within the calling thread, so that
+        errors are raised to the caller; at most four files per worker
+        are submitted to the pool ahead of the yielded results."""
+        files = ((dirpath, fn) for dirpath, dirnames, filenames
+                 in walkdepth(self.root, depth) for fn in filenames)
+
+        def docs_from_file(args):
+            return args[0], args[1], list(self.docs_from_file(*args))
+
+        if workers is not None and workers > 1:
+            pool = ThreadPool(workers)
+            try:
+                pending = deque()
+                for args in files:
+                    pending.append(pool.apply_async(docs_from_file, (args,)))
+                    if len(pending) >= 4 * workers:
+                        yield pending.popleft().get()
+                while pending:
+                    yield pending.popleft().get()
+            finally:
+                pool.terminate()
+        else:
+            for args in files:
+                yield docs_from_file(args)
+
+    def crawl(self, depth=0, workers=None):
         """Crawl through the `root` directory.
 
         The crawler will inspect every file and directory up
@@ -95,19 +148,27 @@ class BaseCrawler(object):
         :param depth: Crawl through the directory for the specified depth.
                       A value of 0 specifies no limit.
         :type dept: int
+        :param workers: The number of threads used to generate documents
+            from files, e.g., to hash multiple files in parallel. The
+            documents are yielded in the same order as without threads.
+        :type workers: int
         :yields: (id, doc)-tuples"""
         logger.info("Crawling '{}' (depth={})...".format(self.root, depth))
-        for dirpath, dirnames, filenames in walkdepth(self.root, depth):
-            for fn in filenames:
-                for doc in self.docs_from_file(dirpath, fn):
-                    logger.debug("doc from file: '{}'.".format(
-                        os.path.join(dirpath, fn)))
-                    doc.setdefault(KEY_PAYLOAD, None)
-                    doc.setdefault(
-                        '_id', self._calculate_hash(doc, dirpath, fn))
-                    yield doc
+        for doc in self._complete_docs(self._docs_from_files(depth, workers)):
+            yield doc
         logger.info("Crawl of '{}' done.".format(self.root))
 
+    def _complete_docs(self, results):
+        "Yield the docs of (dirpath, fn, docs)-tuples with default values."
+        for dirpath, fn, docs in results:
+            for doc in docs:
+                logger.debug("doc from file: '{}'.".format(
+                    os.path.join(dirpath, fn)))
+                doc.setdefault(KEY_PAYLOAD, None)
+                doc.setdefault(
+                    '_id', self._calculate_hash(doc, dirpath, fn))
+                yield doc
+
     def process(self, doc, dirpath, fn):
         """Implement this method for additional processing of generated docs.
 
@@ -122,6 +183,73 @@ class BaseCrawler(object):
         return doc
 
 
+# Matches the opening of named groups, which are not escaped.
+_RE_NAMED_GROUP = re.compile(r'(?<!\\)((?:\\\\)*)\(\?P<\w+>')
+
+# Matches back references and inline flags, which prevent definitions
+# from being combined.
+_RE_NOT_COMBINABLE = re.compile(r'\(\?P=|\\g<|\\[1-9]|\(\?[aiLmsux]')
+
+
+class _DefinitionsMatcher(object):
+    """Match paths against all regular expressions of a definitions mapping.
+
+    The regular expressions are combined into one alternation, where each
+    alternative is marked by an empty named group. Matching a path against
+    the alternation determines the first matching definition with a single
+    call; the search is then continued with the alternation of all
+    subsequent definitions. That means non-matching paths are rejected
+    with a single call, independent of the number of definitions.
+
+    Definitions with back references, inline flags or different flags
+    can't be combined and are matched one by one.
+    """
+
+    def __init__(self, definitions):
+        self.definitions = definitions
+        self._items = list(definitions.items())
+        self._combined = self._combine([regex for regex, _ in self._items])
+
+    @staticmethod
+    def _combine(regexes):
+        "Return the combined alternations or None if not possible."
+        flags = set(regex.flags for regex in regexes)
+        if len(flags) != 1:
+            return None
+        flags = flags.pop()
+        patterns = []
+        for i, regex in enumerate(regexes):
+            if not is_string(regex.pattern) or \
+                    _RE_NOT_COMBINABLE.search(regex.pattern):
+                return None
+            patterns.append('(?:{})(?P<_{}>)'.format(
+                _RE_NAMED_GROUP.sub(r'\1(?:', regex.pattern), i))
+        try:
+            return [re.compile('|'.join(patterns[i:]), flags)
+                    for i in range(len(patterns))]
+        except (re.error, AssertionError):
+            # Python 2 limits the number of groups per expression.
+            return None
+
+    def matches(self, path):
+        "Yield the regex, format and match for all definitions matching path."
+        if self._combined is None:
+            for regex, format_ in self._items:
+                m = regex.match(path)
+                if m:
+                    yield regex, format_, m
+            return
+        i = 0
+        while i < len(self._items):
+            m = self._combined[i].match(path)
+            if m is None:
+                return
+            i = int(m.lastgroup[1:])
+            regex, format_ = self._items[i]
+            yield regex, format_, regex.match(path)
+            i += 1
+
+
 class RegexFileCrawler(BaseCrawler):
     """Generate documents from filenames and associate each file with a data type.
 
@@ -165,10 +293,31 @@ class RegexFileCrawler(BaseCrawler):
     expects a `file-like object`_ as its first argument.
 
     .. _`file-like object`: https://docs.python.org/3/glossary.html#term-file-object
+
+    The file id of each file is the hash value of its data, which is
+    calculated with the :attr:`hash_algorithm`. To avoid reading unchanged
+    files on every crawl, specify a persistent hash cache with
+    :attr:`fn_hash_cache`; files with the same path, size, modification time
+    and inode as during the last crawl are then not read again. The hash
+    cache itself is never indexed, even if it is stored within the root
+    directory and matches one of the definitions. Alternatively,
+    the computation of the file ids can be deferred until the files are
+    exported to a mirror with :attr:`defer_file_id`. Documents with deferred
+    file ids have a file id of None, and their document ids do not depend
+    on the file data.
     """
     "Mapping of compiled regex objects and associated formats."
     definitions = dict()
 
+    "The name of the hashlib algorithm used to calculate file ids."
+    hash_algorithm = 'md5'
+
+    "The filename of the persistent hash cache, relative to root or absolute."
+    fn_hash_cache = None
+
+    "Defer the calculation of file ids until the export to a mirror."
+    defer_file_id = False
+
     @classmethod
     def define(cls, regex, format_=None):
         """Define a format for a particular regular expression.
@@ -198,9 +347,47 @@ class RegexFileCrawler(BaseCrawler):
         :param file: The associated file
         :returns: The file id.
         """
-        file_id = doc['md5'] = md5(file)
+        file_id = doc[cls.hash_algorithm] = _file_hash(file, cls.hash_algorithm)
+        return file_id
+
+    def _get_file_id(self, doc, fn):
+        "Return the file id of fn, using the hash cache if possible."
+        cache = getattr(self, '_hash_cache', None)
+        if cache is None or \
+                getattr(self.compute_file_id, '__func__', None) is not \
+                RegexFileCrawler.compute_file_id.__func__:
+            with open(fn, 'rb') as file:
+                return self.compute_file_id(doc, file)
+        old, new = cache
+        key = os.path.abspath(fn)
+        st = os.stat(fn)
+        signature = [st.st_size, st.st_mtime, st.st_ino, self.hash_algorithm]
+        entry = old.get(key)
+        if entry is not None and entry[:-1] == signature:
+            file_id = doc[self.hash_algorithm] = entry[-1]
+        else:
+            with open(fn, 'rb') as file:
+                file_id = self.compute_file_id(doc, file)
+        if _is_stable_mtime(st.st_mtime):
+            new[key] = signature + [file_id]
         return file_id
 
+    def _get_matcher(self):
+        "Return the matcher for the current definitions."
+        matcher = getattr(self, '_matcher', None)
+        if matcher is None or matcher.definitions is not self.definitions \
+                or len(matcher._items) != len(self.definitions):
+            matcher = self._matcher = _DefinitionsMatcher(self.definitions)
+        return matcher
+
+    def _is_hash_cache(self, fn):
+        "Return True if fn is the file of the persistent hash cache."
+        if self.fn_hash_cache is None or \
+                os.path.basename(fn) != os.path.basename(self.fn_hash_cache):
+            return False
+        fn_cache = os.path.join(self.root, self.fn_hash_cache)
+        return os.path.abspath(fn) == os.path.abspath(fn_cache)
+
     def docs_from_file(self, dirpath, fn):
         """Generate documents from filenames.
 
@@ -209,17 +396,20 @@ class RegexFileCrawler(BaseCrawler):
         It is not recommended to reimplement this method to modify
         documents generated from filenames.
         See :meth:`~RegexFileCrawler.process` instead."""
-        for regex, format_ in self.definitions.items():
-            m = regex.match(os.path.join(dirpath, fn))
-            if m:
-                doc = self.process(m.groupdict(), dirpath, fn)
-                doc[KEY_FILENAME] = os.path.relpath(
-                    os.path.join(dirpath, fn), self.root)
-                doc[KEY_PATH] = os.path.abspath(self.root)
-                doc[KEY_PAYLOAD] = str(format_)
-                with open(os.path.join(dirpath, fn), 'rb') as file:
-                    doc['file_id'] = self.compute_file_id(doc, file)
-                yield doc
+        ffn = os.path.join(dirpath, fn)
+        if self._is_hash_cache(ffn):
+            return
+        for regex, format_, m in self._get_matcher().matches(ffn):
+            doc = self.process(m.groupdict(), dirpath, fn)
+            doc[KEY_FILENAME] = os.path.relpath(ffn, self.root)
+            doc[KEY_PATH] = os.path.abspath(self.root)
+            doc[KEY_PAYLOAD] = str(format_)
+            if self.defer_file_id:
+                doc['file_id'] = None
+                doc[KEY_HASH_ALGORITHM] = self.hash_algorithm
+            else:
+                doc['file_id'] = self._get_file_id(doc, ffn)
+            yield doc
 
     def fetch(self, doc, mode='r'):
         """Fetch the data associated with `doc`.
@@ -231,18 +421,16 @@ class RegexFileCrawler(BaseCrawler):
         """
         fn = doc.get(KEY_FILENAME)
         if fn:
-            for regex, format_ in self.definitions.items():
-                ffn = os.path.join(self.root, fn)
-                m = regex.match(ffn)
-                if m:
-                    if is_string(format_):
-                        return open(ffn, mode=mode)
-                    else:
-                        for meth in ('read', 'close'):
-                            if not callable(getattr(format_, meth, None)):
-                                msg = "Format {} has no {}() method.".format(format_, meth)
-                                warnings.warn(msg)
-                        return format_(open(ffn, mode=mode))
+            ffn = os.path.join(self.root, fn)
+            for regex, format_, m in self._get_matcher().matches(ffn):
+                if is_string(format_):
+                    return open(ffn, mode=mode)
+                else:
+                    for meth in ('read', 'close'):
+                        if not callable(getattr(format_, meth, None)):
+                            msg = "Format {} has no {}() method.".format(format_, meth)
+                            warnings.warn(msg)
+                    return format_(open(ffn, mode=mode))
             else:
                 raise errors.FetchError("Unable to match file path of doc '{}' "
                                         "to format definition.".format(doc))
@@ -284,12 +472,33 @@ class RegexFileCrawler(BaseCrawler):
                         result[key] = float(value)
         return super(RegexFileCrawler, self).process(result, dirpath, fn)
 
-    def crawl(self, depth=0):
-        if self.definitions:
-            for doc in super(RegexFileCrawler, self).crawl(depth=depth):
+    def crawl(self, depth=0, workers=None):
+        """Crawl through the `root` directory.
+
+        If a hash cache is specified with :attr:`fn_hash_cache`,
+        it is read before and updated after the crawl.
+
+        :param depth: Crawl through the directory for the specified depth.
+                      A value of 0 specifies no limit.
+        :type dept: int
+        :param workers: The number of threads used to calculate the
+            file ids of multiple files in parallel.
+        :type workers: int
+        :yields: (id, doc)-tuples"""
+        if not self.definitions:
+            return
+        if self.fn_hash_cache is None or self.defer_file_id:
+            for doc in super(RegexFileCrawler, self).crawl(depth=depth, workers=workers):
                 yield doc
-        else:
             return
+        fn_cache = os.path.join(self.root, self.fn_hash_cache)
+        self._hash_cache = _read_snapshot(fn_cache), dict()
+        try:
+            for doc in super(RegexFileCrawler, self).crawl(depth=depth, workers=workers):
+                yield doc
+            _write_snapshot(fn_cache, self._hash_cache[1])
+        finally:
+            self._hash_cache = None
 
 
 class JSONCrawler(BaseCrawler):
@@ -307,6 +516,90 @@ class JSONCrawler(BaseCrawler):
                     yield d
 
 
+def _read_snapshot(fn):
+    "Read an index snapshot, which maps job ids to file signatures."
+    try:
+        with open(fn, 'rb') as file:
+            return json.loads(file.read().decode())
+    except IOError as error:
+        if error.errno != errno.ENOENT:
+            raise
+        return dict()
+
+
+def _write_snapshot(fn, snapshot):
+    "Write an index snapshot with write concern."
+    dirname, filename = os.path.split(fn)
+    fn_tmp = os.path.join(dirname, '._{uid}_{fn}'.format(
+        uid=uuid.uuid4(), fn=filename))
+    with open(fn_tmp, 'wb') as file:
+        file.write(json.dumps(snapshot).encode())
+    if six.PY2:
+        os.rename(fn_tmp, fn)
+    else:
+        os.replace(fn_tmp, fn)
+
+
+def _file_signature(fn):
+    "Return the modification time and size of a file or None."
+    try:
+        st = os.stat(fn)
+    except OSError as error:
+        if error.errno != errno.ENOENT:
+            raise
+        return None, None
+    return st.st_mtime, st.st_size
+
+
+def _job_signature(root, job_id, fns):
+    """Return the signature of the job's files for incremental indexing.
+
+    The signature is None if any of the files was modified too recently
+    for its modification time to be reliable."""
+    signature = []
+    for fn in fns:
+        mtime, size = _file_signature(os.path.join(root, job_id, fn))
+        if mtime is not None and not _is_stable_mtime(mtime):
+            return None
+        signature.extend((mtime, size))
+    return signature
+
+
+def _index_signac_job(root, job_id,
+                      include_job_document, fn_statepoint, fn_job_document,
+                      statepoint_index, signac_id_alias, encoding,
+                      snapshot=None, fns=None):
+    """Read the index document of a single job.
+
+    Returns a tuple of the job id, the job's snapshot signature, statepoint
+    and index document. The statepoint and index document are None if the
+    job did not change with respect to the snapshot."""
+    signature = None
+    if snapshot is not None:
+        signature = _job_signature(root, job_id, fns)
+        if signature is not None and snapshot.get(job_id) == signature:
+            return job_id, signature, None, None
+    doc = dict(signac_id=job_id)
+    if signac_id_alias:
+        doc[signac_id_alias] = job_id
+    fn_sp = os.path.join(root, job_id, fn_statepoint)
+    with open(fn_sp, 'rb') as file:
+        sp = json.loads(file.read().decode(encoding))
+        if statepoint_index:
+            doc[statepoint_index] = sp
+        else:
+            doc.update(sp)
+    if include_job_document:
+        fn_doc = os.path.join(root, job_id, fn_job_document)
+        try:
+            with open(fn_doc, 'rb') as file:
+                doc.update(json.loads(file.read().decode(encoding)))
+        except IOError as error:
+            if error.errno != errno.ENOENT:
+                raise
+    return job_id, signature, sp, doc
+
+
 def _index_signac_project_workspace(root,
                                     include_job_document=True,
                                     fn_statepoint='signac_statepoint.json',
@@ -314,40 +607,56 @@ def _index_signac_project_workspace(root,
                                     statepoint_index='statepoint',
                                     signac_id_alias='_id',
                                     encoding='utf-8',
-                                    statepoint_dict=None):
-    "Yields standard index documents for a signac project workspace."
-    m = re.compile(r'[a-f0-9]{32}')
+                                    statepoint_dict=None,
+                                    snapshot=None,
+                                    workers=None):
+    """Yields standard index documents for a signac project workspace.
+
+    If a snapshot mapping is provided, only documents for new or modified
+    jobs are generated, as well as tombstone documents for jobs, which were
+    removed. The snapshot is updated in place.
+
+    If workers is larger than one, the job directories are read by a pool
+    of threads. The documents are yielded in the same order in either case."""
+    job_ids = _list_job_dirs(root)
+    fns = None
+    if snapshot is not None:
+        fns = [fn_statepoint, fn_job_document] if include_job_document else [fn_statepoint]
+        for job_id in set(snapshot).difference(job_ids):
+            del snapshot[job_id]
+            doc = {'signac_id': job_id, KEY_TOMBSTONE: True}
+            if signac_id_alias:
+                doc[signac_id_alias] = job_id
+            yield doc
+    index_job = functools.partial(
+        _index_signac_job, root,
+        include_job_document=include_job_document,
+        fn_statepoint=fn_statepoint,
+        fn_job_document=fn_job_document,
+        statepoint_index=statepoint_index,
+        signac_id_alias=signac_id_alias,
+        encoding=encoding,
+        snapshot=snapshot,
+        fns=fns)
+    pool = None
+    if workers is not None and workers > 1:
+        pool = ThreadPool(workers)
+        chunksize = max(1, min(100, len(job_ids) // (4 * workers)))
+        results = pool.imap(index_job, job_ids, chunksize)
+    else:
+        results = (index_job(job_id) for job_id in job_ids)
     try:
-        job_ids = [jid for jid in os.listdir(root) if m.match(jid)]
-    except OSError as error:
-        if error.errno == errno.ENOENT:
-            return
-        else:
-            raise
-    for job_id in job_ids:
-        if not m.match(job_id):
-            continue
-        doc = dict(signac_id=job_id)
-        if signac_id_alias:
-            doc[signac_id_alias] = job_id
-        fn_sp = os.path.join(root, job_id, fn_statepoint)
-        with open(fn_sp, 'rb') as file:
-            sp = json.loads(file.read().decode(encoding))
+        for job_id, signature, sp, doc in results:
+            if snapshot is not None:
+                snapshot[job_id] = signature
+            if doc is None:
+                continue
             if statepoint_dict is not None:
                 statepoint_dict[job_id] = sp
-            if statepoint_index:
-                doc[statepoint_index] = sp
-            else:
-                doc.update(sp)
-        if include_job_document:
-            fn_doc = os.path.join(root, job_id, fn_job_document)
-            try:
-                with open(fn_doc, 'rb') as file:
-                    doc.update(json.loads(file.read().decode(encoding)))
-            except IOError as error:
-                if error.errno != errno.ENOENT:
-                    raise
-        yield doc
+            yield doc
+    finally:
+        if pool is not None:
+            pool.terminate()
 
 
 class SignacProjectCrawler(RegexFileCrawler):
@@ -399,7 +708,30 @@ class SignacProjectCrawler(RegexFileCrawler):
                 doc.update(statepoint)
         return super(SignacProjectCrawler, self).process(doc, dirpath, fn)
 
-    def crawl(self, depth=0):
+    def crawl(self, depth=0, snapshot=None, workers=None):
+        """Crawl through the project's workspace.
+
+        :param depth: Crawl through the directory for the specified depth.
+                      A value of 0 specifies no limit.
+        :type depth: int
+        :param snapshot: The filename of an index snapshot. If provided,
+            job index documents are only generated for jobs, which were
+            added or modified since the last crawl with the same snapshot.
+            For each removed job, a tombstone document containing the
+            key :const:`KEY_TOMBSTONE` is generated instead.
+            The snapshot is updated once the crawl is completed.
+            Documents for files matching format definitions are always
+            generated.
+        :type snapshot: str
+        :param workers: The number of threads used to read the manifest
+            files and job documents concurrently. This may significantly
+            speed up the indexing of workspaces on file systems with high
+            latency. The same number of threads is used to calculate the
+            file ids of files matching format definitions. By default,
+            all files are read sequentially.
+        :type workers: int
+        :yields: index documents"""
+        sn = None if snapshot is None else _read_snapshot(snapshot)
         for doc in _index_signac_project_workspace(
                 root=self.root,
                 fn_statepoint=self.fn_statepoint,
@@ -407,10 +739,17 @@ class SignacProjectCrawler(RegexFileCrawler):
                 statepoint_index=self.statepoint_index,
                 signac_id_alias=self.signac_id_alias,
                 encoding=self.encoding,
-                statepoint_dict=self._statepoints):
+                statepoint_dict=self._statepoints,
+                snapshot=sn,
+                workers=workers):
+            if doc.get(KEY_TOMBSTONE):
+                yield doc
+            else:
                 yield self.process(doc, None, None)
-        for doc in super(SignacProjectCrawler, self).crawl(depth=depth):
+        for doc in super(SignacProjectCrawler, self).crawl(depth=depth, workers=workers):
             yield doc
+        if snapshot is not None:
+            _write_snapshot(snapshot, sn)
 
 
 class MasterCrawler(BaseCrawler):
@@ -422,6 +761,9 @@ class MasterCrawler(BaseCrawler):
     If the master crawlers has defined tags, it will only
     execute slave crawlers with at least one matching tag.
 
+    The slave crawlers of different modules may be executed concurrently
+    by a pool of processes, see :meth:`crawl`.
+
     :param root: The path to the root directory to crawl through.
     :type root: str
     :param mirrors: An optional set of mirrors, to export data to."""
@@ -449,10 +791,20 @@ class MasterCrawler(BaseCrawler):
             elif self.tags is not None and len(set(self.tags)):
                 logger.info("Skipping, crawler has no defined tags.")
                 continue
-            for doc in crawler.crawl():
-                doc.setdefault(
-                    KEY_PROJECT, os.path.relpath(dirpath, self.root))
-                yield doc
+            start = time()
+            num_docs = 0
+            try:
+                for doc in crawler.crawl():
+                    doc.setdefault(
+                        KEY_PROJECT, os.path.relpath(dirpath, self.root))
+                    num_docs += 1
+                    yield doc
+            except Exception:
+                logger.exception("Error while executing slave crawler '{}' from "
+                                 "module '{}'.".format(crawler_id, name))
+            else:
+                logger.info("Slave crawler '{}' generated {} documents in {:.2f}s.".format(
+                    crawler_id, num_docs, time() - start))
 
     def docs_from_file(self, dirpath, fn):
         if fn == self.FN_ACCESS_MODULE:
@@ -471,6 +823,55 @@ class MasterCrawler(BaseCrawler):
             else:
                 logger.debug("Executed slave crawlers.")
 
+    def _docs_from_modules(self, depth, processes):
+        "Yield the docs of all access modules generated by a pool of processes."
+        modules = [(self, dirpath, fn)
+                   for dirpath, dirnames, filenames in walkdepth(self.root, depth)
+                   for fn in filenames if fn == self.FN_ACCESS_MODULE]
+        pool = Pool(processes)
+        try:
+            for result in pool.imap_unordered(_crawl_access_module, modules):
+                yield result
+        finally:
+            pool.terminate()
+
+    def crawl(self, depth=0, workers=None, processes=None):
+        """Crawl through the `root` directory.
+
+        :param depth: Crawl through the directory for the specified depth.
+                      A value of 0 specifies no limit.
+        :type dept: int
+        :param workers: The number of threads used to execute the
+            slave crawlers of multiple modules concurrently.
+        :type workers: int
+        :param processes: The number of processes used to execute the
+            slave crawlers of multiple modules concurrently. The documents
+            of each module are yielded as soon as all of its slave crawlers
+            are completed, in the order of completion. The crawler instance
+            is pickled and sent to the processes, hence it must be picklable
+            and its class importable by the processes.
+        :type processes: int
+        :yields: (id, doc)-tuples"""
+        if processes is None or processes <= 1:
+            for doc in super(MasterCrawler, self).crawl(depth=depth, workers=workers):
+                yield doc
+            return
+        logger.info("Crawling '{}' (depth={}) with {} processes...".format(
+            self.root, depth, processes))
+        for doc in self._complete_docs(self._docs_from_modules(depth, processes)):
+            yield doc
+        logger.info("Crawl of '{}' done.".format(self.root))
+
+
+def _crawl_access_module(args):
+    "Execute the slave crawlers of one access module within a worker process."
+    master, dirpath, fn = args
+    start = time()
+    docs = list(master.docs_from_file(dirpath, fn))
+    logger.info("Executed slave crawlers of module '{}' in {:.2f}s.".format(
+        os.path.join(dirpath, fn), time() - start))
+    return dirpath, fn, docs
+
 
 def _load_crawler(name):
     if six.PY2:
@@ -567,6 +968,7 @@ def export_to_mirror(doc, mirror, num_tries=3, timeout=60):
     :type timeout: int
     :returns: The file id after successful export.
     """
+    _resolve_file_id(doc)
     if 'file_id' not in doc:
         raise errors.ExportError("Doc '{}' does not have a file_id entry.".format(doc))
     for i in range(num_tries):
@@ -600,6 +1002,8 @@ def export_one(doc, index, mirrors=None, num_tries=3, timeout=60):
     :type timeout: int
     :returns: The id and file id after successful export.
     """
+    if mirrors:
+        _resolve_file_id(doc)
     index.replace_one({'_id': doc['_id']}, doc, upsert=True)
     if mirrors and 'file_id' in doc:
         for mirror in mirrors:
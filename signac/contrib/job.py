@@ -6,10 +6,11 @@ import errno
 import logging
 import json
 import shutil
-import copy
+from contextlib import contextmanager
 
 from ..common import six
 from ..core.jsondict import JSonDict
+from ..core.jsondict import _flush_buffer
 from ..core.attr_dict import AttrDict
 from ..core.attr_dict import convert_to_dict
 from .hashing import calc_id
@@ -24,7 +25,11 @@ class Job(object):
 
     Application developers should usually not need to directly
     instantiate this class, but use :meth:`~.project.Project.open_job`
-    instead."""
+    instead.
+
+    A job may also be constructed from the id of an initialized job
+    only, in which case the statepoint is loaded when it is first
+    accessed."""
     FN_MANIFEST = 'signac_statepoint.json'
     """The job's manifest filename.
 
@@ -34,10 +39,24 @@ class Job(object):
     FN_DOCUMENT = 'signac_job_document.json'
     "The job's document filename."
 
-    def __init__(self, project, statepoint):
+    def __init__(self, project, statepoint=None, _id=None):
         self._project = project
-        self._statepoint = json.loads(json.dumps(statepoint))
-        self._id = calc_id(self._statepoint)
+        if statepoint is None:
+            if _id is None:
+                raise ValueError("Either the statepoint or the id is required.")
+            self._statepoint = None
+            self._statepoint_blob = None
+            self._id = _id
+        elif _id is None:
+            self._statepoint_blob = json.dumps(statepoint)
+            self._statepoint = json.loads(self._statepoint_blob)
+            self._id = calc_id(self._statepoint)
+        else:
+            # The statepoint was already decoded and hashed by the caller,
+            # e.g., by Project.init_jobs().
+            self._statepoint_blob = None
+            self._statepoint = statepoint
+            self._id = _id
         self._document = None
         self._wd = os.path.join(project.workspace(), str(self))
         self._cwd = list()
@@ -69,12 +88,27 @@ class Job(object):
         :rtype: str"""
         return self._wd
 
+    def _get_statepoint(self):
+        """Return the statepoint, which is loaded on first access.
+
+        The returned statepoint is shared and must not be modified."""
+        if self._statepoint is None:
+            self._statepoint = self._project.get_statepoint(self._id)
+        return self._statepoint
+
     def statepoint(self):
         """The statepoint associated with this job.
 
+        Each call returns a new copy of the statepoint, which is decoded
+        from the job's cached JSON representation.
+
         :return: The statepoint mapping.
-        :rtype: dict"""
-        return copy.deepcopy(self._statepoint)
+        :rtype: dict
+        :raises KeyError: If the statepoint of a job constructed from
+            its id can no longer be found."""
+        if self._statepoint_blob is None:
+            self._statepoint_blob = json.dumps(self._get_statepoint())
+        return json.loads(self._statepoint_blob)
 
     def reset_statepoint(self, new_statepoint):
         """Reset the state point of this job.
@@ -97,6 +131,7 @@ class Job(object):
             return
         fn_manifest = os.path.join(self.workspace(), self.FN_MANIFEST)
         fn_manifest_backup = fn_manifest + '~'
+        _flush_buffer(self.workspace())
         try:
             os.rename(fn_manifest, fn_manifest_backup)
             try:
@@ -162,6 +197,34 @@ class Job(object):
     def sp(self, new_sp):
         self._reset_sp(new_sp)
 
+    @contextmanager
+    def buffered_sp(self):
+        """Context manager to apply all state point changes at once.
+
+        Modifying the job's state point via :attr:`~.sp` usually resets
+        the state point after each modification, which moves the job's
+        workspace. Within this context, the state point is only reset
+        once when exiting it:
+
+        .. code-block:: python
+
+            with job.buffered_sp() as sp:
+                sp.a = 1
+                sp.b = 2
+
+        If the context is exited due to an exception, all pending changes
+        are discarded and the state point is left unchanged.
+
+        :yields: The job's state point as attribute dictionary."""
+        sp = self.sp
+        try:
+            with sp._buffered():
+                yield sp
+        except BaseException:
+            if not sp._buffered_depth:
+                self._sp = None
+            raise
+
     @property
     def document(self):
         """The document associated with this job.
@@ -172,7 +235,7 @@ class Job(object):
             self._create_directory()
             fn = os.path.join(self.workspace(), self.FN_DOCUMENT)
             self._document = JSonDict(
-                fn, synchronized=True, write_concern=True)
+                fn, synchronized=True, write_concern=True, cached=True)
         return self._document
 
     def _create_directory(self, overwrite=False):
@@ -182,9 +245,11 @@ class Job(object):
         # Create the workspace directory if it did not exist yet.
         _mkdir_p(self.workspace())
 
+        # The manifest file only needs to be verified if it existed before.
+        created = False
         try:
             # Ensure to create the binary to write before file creation
-            blob = json.dumps(self.statepoint(), indent=2)
+            blob = json.dumps(self._get_statepoint(), indent=2)
 
             try:
                 # Open the file for writing only if it does not exist yet.
@@ -202,9 +267,11 @@ class Job(object):
                     else:
                         with os.fdopen(fd, 'w') as file:
                             file.write(blob)
+                        created = True
                 else:
                     with open(fn_manifest, 'w' if overwrite else 'x') as file:
                         file.write(blob)
+                    created = True
             except IOError as error:
                 if not error.errno == errno.EEXIST:
                     raise
@@ -216,7 +283,8 @@ class Job(object):
                 pass
             raise error
         else:
-            self._check_manifest()
+            if not created:
+                self._check_manifest()
 
     def _check_manifest(self):
         "Check whether the manifest file, if it exists, is correct."
@@ -244,6 +312,7 @@ class Job(object):
 
         This function will do nothing if the workspace directory
         does not exist."""
+        _flush_buffer(self.workspace(), discard=True)
         try:
             shutil.rmtree(self.workspace())
         except OSError as error:
@@ -264,8 +333,9 @@ class Job(object):
         :type project: :py:class:`~.project.Project`
         :raises DestinationExistsError: If the job is already initialized in project.
         """
-        dst = project.open_job(self.statepoint())
+        dst = project.open_job(self._get_statepoint())
         _mkdir_p(project.workspace())
+        _flush_buffer(self.workspace())
         try:
             os.rename(self.workspace(), dst.workspace())
         except OSError:
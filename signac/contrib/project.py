@@ -7,20 +7,29 @@ import re
 import logging
 import json
 import errno
+import gzip
+import uuid
 import warnings
 import collections
 import shutil
+import difflib
 from itertools import chain
+from bisect import bisect_left
+from multiprocessing.pool import ThreadPool
 
 from ..core.search_engine import DocumentSearchEngine
+from ..core.jsondict import buffer_writes, _flush_buffer, DEFAULT_BUFFER_SIZE
 from ..common import six
 from ..common.config import load_config
 from .job import Job
-from .hashing import calc_id
+from .hashing import calc_ids
 from .indexing import _index_signac_project_workspace
+from .indexing import _read_snapshot, _write_snapshot
 from .indexing import SignacProjectCrawler
 from .indexing import MasterCrawler
-from .utility import _mkdir_p, is_string
+from .utility import _mkdir_p, is_string, walkdepth, _list_job_dirs
+from .utility import _get_mtime, _is_stable_mtime
+from .table import _flatten, _make_columns, _write_table, _read_table
 from .errors import DestinationExistsError
 
 if six.PY2:
@@ -31,7 +40,14 @@ else:
 logger = logging.getLogger(__name__)
 
 #: The default filename to read from and write statepoints to.
-FN_STATEPOINTS = 'signac_statepoints.json'
+FN_STATEPOINTS = 'signac_statepoints.jsonl'
+
+#: The filename of the statepoints file written by previous versions,
+#: which is still read, but no longer written to.
+FN_STATEPOINTS_LEGACY = 'signac_statepoints.json'
+
+#: The filename of the persistent state point cache within the project root.
+FN_CACHE = '.signac_sp_cache.json.gz'
 
 ACCESS_MODULE_TEMPLATE = """#!/usr/bin/env python
 # -*- coding: utf-8 -*-
@@ -70,20 +86,50 @@ class JobSearchIndex(object):
     :param include: A mapping of keys that shall be
         included (True) or excluded (False).
     :type include: Mapping
+    :param compact: Store the job ids of the underlying search
+        engine as compact integer arrays.
+    :type compact: bool
     """
 
-    def __init__(self, index, include=None, hash_=None):
+    def __init__(self, index, include=None, hash_=None, compact=False):
         self._engine = DocumentSearchEngine(
-            index, include=include, hash_=hash_)
+            index, include=include, hash_=hash_, compact=compact)
 
     def __len__(self):
         return len(self._engine)
 
+    def save(self, path):
+        """Save the search index to a binary file.
+
+        Short-lived processes may use :meth:`~.load` to share
+        a prebuilt index instead of indexing the workspace.
+
+        :param path: The path of the file.
+        :type path: str
+        """
+        self._engine.save(path)
+
+    @classmethod
+    def load(cls, path, hash_=None):
+        """Load a search index from a file created with :meth:`~.save`.
+
+        :param path: The path of the file.
+        :type path: str
+        :returns: The loaded job search index.
+        :rtype: :class:`~.JobSearchIndex`
+        :raises ValueError: If the file is not a valid index file.
+        """
+        search_index = cls(index=None)
+        search_index._engine = DocumentSearchEngine.load(path, hash_=hash_)
+        return search_index
+
     def find_job_ids(self, filter=None, doc_filter=None):
         """Find the job_ids of all jobs matching the filters.
 
         The optional filter arguments must be a Mapping of key-value
-        pairs and JSON serializable.
+        pairs and JSON serializable. Values may be compared with the
+        ``$gt``, ``$gte``, ``$lt``, ``$lte``, ``$in``, ``$ne`` and
+        ``$exists`` operators, e.g. ``{'a': {'$gt': 0}}``.
 
         :param filter: A mapping of key-value pairs that all
             indexed job statepoints are compared against.
@@ -118,6 +164,12 @@ class Project(object):
             config = load_config()
         self._config = config
         self.get_id()
+        self._sp_cache = None
+        self._sp_cache_mtime = None
+        self._job_ids = None
+        self._job_ids_mtime = None
+        self._min_len_unique_id = None
+        self._sp_files = dict()
 
     def __str__(self):
         "Returns the project's id."
@@ -178,18 +230,14 @@ class Project(object):
 
     def min_len_unique_id(self):
         "Determine the minimum length required for an id to be unique."
-        job_ids = list(self.find_job_ids())
-        tmp = set()
-        for i in range(32):
-            tmp.clear()
-            for _id in job_ids:
-                if _id[:i] in tmp:
-                    break
-                else:
-                    tmp.add(_id[:i])
-            else:
-                break
-        return i
+        job_ids = self._get_job_ids()
+        if self._min_len_unique_id is None or self._min_len_unique_id[0] is not job_ids:
+            # Ids sharing the longest prefix are adjacent in the sorted list.
+            n = 0
+            for a, b in zip(job_ids, job_ids[1:]):
+                n = max(n, len(os.path.commonprefix([a, b])) + 1)
+            self._min_len_unique_id = job_ids, n
+        return self._min_len_unique_id[1]
 
     def open_job(self, statepoint=None, id=None):
         """Get a job handle associated with a statepoint.
@@ -211,6 +259,10 @@ class Project(object):
             If the attempt to open the job by id fails.
         :raises LookupError: If the attempt to open the job by an
             abbreviated id returns more than one match.
+
+        .. note::
+            The statepoint of a job opened by the id of an initialized job
+            is only loaded when it is first accessed.
         """
         if (id is None) == (statepoint is None):
             raise ValueError(
@@ -219,28 +271,113 @@ class Project(object):
             return self.Job(project=self, statepoint=statepoint)
         else:
             if len(id) < 32:
-                job_ids = self.find_job_ids()
-                matches = [_id for _id in job_ids if _id.startswith(id)]
+                matches = _find_prefix(self._get_job_ids(), id, limit=2)
                 if len(matches) == 1:
-                    id = matches[0]
+                    return self.Job(project=self, _id=matches[0])
                 elif len(matches) > 1:
                     raise LookupError(id)
+            elif os.path.isdir(os.path.join(self.workspace(), id)):
+                return self.Job(project=self, _id=id)
             return self.Job(project=self, statepoint=self.get_statepoint(id))
 
+    def init_jobs(self, statepoints, workers=None, processes=None):
+        """Initialize the jobs associated with all statepoints.
+
+        This is equivalent to calling ``project.open_job(sp).init()`` for
+        each statepoint, but the job ids are calculated in one batch and
+        the workspace directories may be created by a pool of threads:
+
+        .. code-block:: python
+
+            jobs = project.init_jobs(
+                [{'a': i} for i in range(1000)], workers=8)
+
+        :param statepoints: The statepoints of the jobs to initialize.
+        :type statepoints: iterable
+        :param workers: The number of threads used to create the job
+            directories concurrently. This may significantly speed up
+            the initialization on file systems with high latency. By
+            default, all jobs are initialized sequentially.
+        :type workers: int
+        :param processes: The number of processes used to calculate the
+            job ids, see :func:`~.hashing.calc_ids`.
+        :type processes: int
+        :returns: The initialized jobs in the order of the statepoints.
+        :rtype: list
+        """
+        statepoints = [json.loads(json.dumps(sp)) for sp in statepoints]
+        ids = calc_ids(statepoints, processes=processes)
+        jobs = [self.Job(project=self, statepoint=sp, _id=_id)
+                for sp, _id in zip(statepoints, ids)]
+        if not jobs:
+            return jobs
+        _mkdir_p(self.workspace())
+        if workers is not None and workers > 1:
+            pool = ThreadPool(workers)
+            try:
+                chunksize = max(1, min(100, len(jobs) // (4 * workers)))
+                for _ in pool.imap(self.Job.init, jobs, chunksize):
+                    pass
+            finally:
+                pool.terminate()
+        else:
+            for job in jobs:
+                job.init()
+        return jobs
+
+    def buffered(self, buffer_size=DEFAULT_BUFFER_SIZE, workers=None):
+        """Context manager to buffer the writes of all job documents.
+
+        Job documents modified within this context are kept in memory
+        and written at once when exiting the context:
+
+        .. code-block:: python
+
+            with project.buffered(workers=8):
+                for job in project:
+                    job.document['result'] = analyze(job)
+
+        The buffer applies to all job documents written by the current
+        thread, not only the ones of this project. Buffered documents are
+        flushed early, when their total size exceeds the buffer size. The
+        durability of the documents is unchanged, they are not synchronized
+        to disk with fsync.
+
+        Like with :meth:`~.JSonDict.buffered`, the buffered documents are
+        discarded if the context is exited due to an exception. Documents
+        are flushed before they are read from disk by other operations,
+        such as :meth:`~.index`, :meth:`~.clone` and :meth:`Job.move`.
+
+        :param buffer_size: The maximum size of all buffered documents
+            in bytes or None for no limit.
+        :type buffer_size: int
+        :param workers: The number of threads used to write the documents.
+            This may significantly speed up the flush on file systems with
+            high latency.
+        :type workers: int
+        """
+        return buffer_writes(buffer_size=buffer_size, workers=workers)
+
     def _job_dirs(self):
-        wd = self.workspace()
-        m = re.compile('[a-f0-9]{32}')
-        try:
-            for d in os.listdir(wd):
-                if m.match(d):
-                    yield d
-        except OSError as error:
-            if error.errno != errno.ENOENT:
-                raise
+        return _list_job_dirs(self.workspace())
+
+    def _get_job_ids(self):
+        """Return a sorted list of the ids of all initialized jobs.
+
+        The list is cached and only regenerated when the modification
+        time of the workspace directory changes. The returned list must
+        not be modified."""
+        mtime = _get_mtime(self.workspace())
+        if mtime is None:
+            return []
+        if self._job_ids is None or mtime != self._job_ids_mtime:
+            self._job_ids = sorted(self._job_dirs())
+            self._job_ids_mtime = mtime if _is_stable_mtime(mtime) else None
+        return self._job_ids
 
     def num_jobs(self):
         "Return the number of initialized jobs."
-        return len(list(self._job_dirs()))
+        return len(self._get_job_ids())
 
     __len__ = num_jobs
 
@@ -252,9 +389,10 @@ class Project(object):
         :returns: True when the job is initialized for this project.
         :rtype: bool
         """
-        return job.get_id() in self.find_job_ids()
+        return len(_find_prefix(self._get_job_ids(), job.get_id(), limit=1)) == 1
 
-    def build_job_search_index(self, index, include=None, hash_=None):
+    def build_job_search_index(self, index, include=None, hash_=None,
+                               compact=False):
         """Build a job search index.
 
         :param index: A document index.
@@ -262,10 +400,14 @@ class Project(object):
         :param include: A mapping of keys that shall be
             included (True) or excluded (False).
         :type include: Mapping
+        :param compact: Store the job ids as compact integer arrays,
+            which reduces the memory usage for large indexes.
+        :type compact: bool
         :returns: A job search index based on the provided index.
         :rtype: :class:`~.JobSearchIndex`
         """
-        return JobSearchIndex(index=index, include=include, hash_=hash_)
+        return JobSearchIndex(
+            index=index, include=include, hash_=hash_, compact=compact)
 
     def build_job_statepoint_index(self, exclude_const=False, index=None):
         """Build a statepoint index to identify jobs with specific parameters.
@@ -293,26 +435,31 @@ class Project(object):
             and a set of corresponding job ids.
         """
         if index is None:
-            index = self.index(include_job_document=False)
+            index = self._sp_index()
         include = {'statepoint': True}
         search_index = self.build_job_search_index(
-            index, include, hash_=json.dumps)
-        tmp = search_index._engine.index
+            index, include, hash_=json.dumps, compact=True)
+        engine = search_index._engine
+        tmp = engine.index
         N = len(search_index)
         for k in sorted(tmp, key=lambda k: len(tmp[k])):
             if exclude_const and len(tmp[k]) == N:
                 continue
-            yield json.dumps(json.loads(k)[1:]), tmp[k]
+            yield json.dumps(json.loads(k)[1:]), engine.resolve(tmp[k])
 
     def find_job_ids(self, filter=None, doc_filter=None, index=None):
         """Find the job_ids of all jobs matching the filters.
 
         The optional filter arguments must be a Mapping of key-value
-        pairs and JSON serializable.
+        pairs and JSON serializable. Values may be compared with the
+        ``$gt``, ``$gte``, ``$lt``, ``$lte``, ``$in``, ``$ne`` and
+        ``$exists`` operators, e.g. ``{'a': {'$gt': 0}}``.
 
         .. note::
+            Without an index, state point filters are evaluated with the
+            persistent state point cache, see :meth:`~.update_cache`.
             Providing a pre-calculated index may vastly increase the
-            performance of this function.
+            performance of this function for job document filters.
 
         :param filter: A mapping of key-value pairs that all
             indexed job statepoints are compared against.
@@ -327,9 +474,12 @@ class Project(object):
             by the index.
         """
         if filter is None and doc_filter is None and index is None:
-            return list(self._job_dirs())
+            return list(self._get_job_ids())
         if index is None:
-            index = self.index(include_job_document=doc_filter is not None)
+            if doc_filter is None:
+                index = self._sp_index()
+            else:
+                index = self.index(include_job_document=True)
         if doc_filter is None:
             include = {'statepoint': True}
         else:
@@ -341,11 +491,15 @@ class Project(object):
         """Find all jobs in the project's workspace.
 
         The optional filter arguments must be a Mapping of key-value
-        pairs and JSON serializable.
+        pairs and JSON serializable. Values may be compared with the
+        ``$gt``, ``$gte``, ``$lt``, ``$lte``, ``$in``, ``$ne`` and
+        ``$exists`` operators, e.g. ``{'a': {'$gt': 0}}``.
 
         .. note::
+            Without an index, state point filters are evaluated with the
+            persistent state point cache, see :meth:`~.update_cache`.
             Providing a pre-calculated index may vastly increase the
-            performance of this function.
+            performance of this function for job document filters.
 
         :param filter: A mapping of key-value pairs that all
             indexed job statepoints are compared against.
@@ -373,8 +527,18 @@ class Project(object):
             a corrupted workspace.
         :type skip_errors: bool
         :yields: statepoints as dict"""
+        if index is None and doc_filter is None:
+            statepoints = self._get_statepoints(skip_errors=skip_errors)
+            if filter is None:
+                job_ids = list(statepoints)
+            else:
+                job_ids = self.find_job_ids(
+                    filter=filter, index=_make_sp_index(statepoints))
+            for job_id in job_ids:
+                yield json.loads(json.dumps(statepoints[job_id]))
+            return
         if index is None:
-            index = self.index(include_job_document=False)
+            index = self.index(include_job_document=True)
         if skip_errors:
             index = _skip_errors(index, logger.critical)
         jobs = self.find_jobs(filter, doc_filter, index)
@@ -387,16 +551,49 @@ class Project(object):
         """Read all statepoints from a file.
 
         :param fn: The filename of the file containing the statepoints,
-            defaults to :const:`~signac.contrib.project.FN_STATEPOINTS`.
+            defaults to :const:`~signac.contrib.project.FN_STATEPOINTS`
+            and :const:`~signac.contrib.project.FN_STATEPOINTS_LEGACY`.
         :type fn: str
 
         See also :meth:`dump_statepoints` and :meth:`write_statepoints`.
         """
+        statepoints = dict()
+        sp_files = self._get_statepoints_files(fn)
+        missing = 0
+        for sp_file in sp_files:
+            try:
+                statepoints.update(sp_file.read())
+            except IOError as error:
+                if not error.errno == errno.ENOENT:
+                    raise
+                missing += 1
+                if missing == len(sp_files):
+                    raise
+        return statepoints
+
+    def _get_statepoints_file(self, fn=None):
+        """Return the handle of the statepoints file fn.
+
+        Files with the '.jsonl' extension are append-only journals, all
+        other files contain one JSON-encoded mapping of all statepoints."""
         if fn is None:
             fn = os.path.join(self.root_directory(), FN_STATEPOINTS)
-        # See comment in write statepoints.
-        with open(fn, 'r') as file:
-            return json.loads(file.read())
+        fn = os.path.abspath(fn)
+        if fn not in self._sp_files:
+            if fn.endswith('.jsonl'):
+                self._sp_files[fn] = _StatepointJournal(fn)
+            else:
+                self._sp_files[fn] = _StatepointFile(fn)
+        return self._sp_files[fn]
+
+    def _get_statepoints_files(self, fn=None):
+        "Return the handles of all statepoints files to read from."
+        if fn is None:
+            return [
+                self._get_statepoints_file(os.path.join(
+                    self.root_directory(), FN_STATEPOINTS_LEGACY)),
+                self._get_statepoints_file()]
+        return [self._get_statepoints_file(fn)]
 
     def dump_statepoints(self, statepoints):
         """Dump the statepoints and associated job ids.
@@ -413,13 +610,18 @@ class Project(object):
                  and the value is the statepoint.
         :rtype: dict
         """
-        return {calc_id(sp): sp for sp in statepoints}
+        statepoints = list(statepoints)
+        return dict(zip(calc_ids(statepoints), statepoints))
 
     def write_statepoints(self, statepoints=None, fn=None, indent=2):
         """Dump statepoints to a file.
 
         If the file already contains statepoints, all new statepoints
         will be appended, while the old ones are preserved.
+        Files with the '.jsonl' extension, such as the default file, are
+        append-only journals with one statepoint per line, so that only
+        statepoints which are not yet contained in the file are written.
+        All other files are rewritten completely.
 
         :param statepoints: A list of statepoints,
             defaults to all statepoints which are defined in the workspace.
@@ -427,25 +629,137 @@ class Project(object):
         :param fn: The filename of the file containing the statepoints,
             defaults to :const:`~signac.contrib.project.FN_STATEPOINTS`.
         :type fn: str
-        :param indent: Specify the indentation of the json file.
+        :param indent: Specify the indentation of the json file,
+            ignored for journals.
         :type indent: int
 
         See also :meth:`dump_statepoints`.
         """
-        if fn is None:
-            fn = os.path.join(self.root_directory(), FN_STATEPOINTS)
-        try:
-            tmp = self.read_statepoints(fn=fn)
-        # except FileNotFoundError:
-        except IOError as error:
-            if not error.errno == errno.ENOENT:
-                raise
-            tmp = dict()
         if statepoints is None:
             statepoints = self.find_statepoints()
-        tmp.update(self.dump_statepoints(statepoints))
-        with open(fn, 'w') as file:
-            file.write(json.dumps(tmp, indent=indent))
+        self._get_statepoints_file(fn).append(
+            self.dump_statepoints(statepoints), indent=indent)
+
+    def _table_docs(self, doc_keys=None, filter=None, doc_filter=None, index=None):
+        "Return the sorted index documents of all jobs matching the filters."
+        if index is not None:
+            index = [doc for doc in index if 'statepoint' in doc]
+        elif doc_keys or doc_filter is not None:
+            index = list(self.index(include_job_document=True))
+        else:
+            index = [{'_id': _id, 'statepoint': sp}
+                     for _id, sp in self._get_statepoints().items()]
+        if filter is not None or doc_filter is not None:
+            job_ids = set(self.find_job_ids(filter, doc_filter, index=index))
+            index = [doc for doc in index if doc['_id'] in job_ids]
+        return sorted(index, key=lambda doc: doc['_id'])
+
+    def _table_keys(self, docs, keys=None, doc_keys=None):
+        "Return the column names for statepoint keys and document keys."
+        if keys is None:
+            sp_keys = {k for doc in docs for k, v in _flatten(doc['statepoint'])}
+        else:
+            sp_keys = keys
+        return ['statepoint.' + key for key in sorted(sp_keys)] + list(doc_keys or [])
+
+    def to_arrays(self, keys=None, doc_keys=None, filter=None, doc_filter=None, index=None):
+        """Return statepoint and job document values as typed column arrays.
+
+        The statepoints and the selected job document values of all jobs
+        matching the filters are flattened into one numpy array per key,
+        where all arrays are sorted by job id:
+
+        .. code-block:: python
+
+            arrays = project.to_arrays(keys=['a'], doc_keys=['result'])
+            for a in numpy.unique(arrays['statepoint.a']):
+                mask = arrays['statepoint.a'] == a
+                print(a, arrays['result'][mask].mean())
+
+        Statepoint columns are named by their dotted key prefixed with
+        'statepoint.' and document columns by their dotted document key.
+        The column '_id' contains the job ids. Numbers with missing values
+        are stored as floats, where missing values are NaN; values which
+        can't be stored as a numpy type are JSON-encoded.
+
+        Without document keys and document filter, the statepoints are
+        read from the persistent state point cache. Otherwise, the values
+        are read from the index argument or from a fresh index of the
+        workspace.
+
+        This function requires numpy.
+
+        :param keys: The dotted statepoint keys, defaults to all.
+        :type keys: list
+        :param doc_keys: The dotted job document keys.
+        :type doc_keys: list
+        :param filter: Only include jobs matching this statepoint filter.
+        :type filter: Mapping
+        :param doc_filter: Only include jobs matching this document filter.
+        :type doc_filter: Mapping
+        :param index: A complete document index of all jobs, e.g., generated
+            with :meth:`~.index`. An incremental index generated with a
+            snapshot only contains the documents of modified jobs and
+            yields incomplete arrays.
+        :type index: list
+        :returns: A mapping of column names to arrays.
+        :rtype: dict
+        :raises ImportError: If numpy is not available.
+        """
+        docs = self._table_docs(doc_keys, filter, doc_filter, index)
+        return _make_columns(docs, self._table_keys(docs, keys, doc_keys))
+
+    def export_statepoints(self, fn, keys=None, doc_keys=None,
+                           filter=None, doc_filter=None, format='npz'):
+        """Export statepoints and job document values as typed columns.
+
+        The statepoints and the selected job document values of all jobs
+        are flattened into one array per key, which are stored in a binary
+        file together with an array of the job ids in the column '_id'.
+        Statepoint columns are named by their dotted key prefixed with
+        'statepoint.', e.g., 'statepoint.a.b', and document columns by their
+        dotted document key, following the layout of index documents.
+
+        The 'npz' format stores all columns in a single file, while the
+        'npy' format stores each column in a separate file within the
+        directory fn, which allows to memory-map the columns.
+        Use :meth:`~.read_statepoint_table` to read the table and
+        see :meth:`~.to_arrays` for details on the columns.
+
+        This function requires numpy.
+
+        :param fn: The filename of the table.
+        :type fn: str
+        :param keys: The dotted statepoint keys to export, defaults to all.
+        :type keys: list
+        :param doc_keys: The dotted job document keys to export.
+        :type doc_keys: list
+        :param filter: Only export jobs matching this statepoint filter.
+        :type filter: Mapping
+        :param doc_filter: Only export jobs matching this document filter.
+        :type doc_filter: Mapping
+        :param format: The table format, either 'npz' or 'npy'.
+        :type format: str
+        :raises ImportError: If numpy is not available.
+        """
+        columns = self.to_arrays(keys, doc_keys, filter, doc_filter)
+        _write_table(fn, columns, format=format)
+
+    def read_statepoint_table(self, fn, mmap_mode='r'):
+        """Read a table written with :meth:`~.export_statepoints`.
+
+        This function requires numpy.
+
+        :param fn: The filename of the table.
+        :type fn: str
+        :param mmap_mode: The mode used to memory-map the columns of a
+            table in the 'npy' format, see :func:`numpy.load`.
+        :type mmap_mode: str
+        :returns: A mapping of column names to arrays.
+        :rtype: dict
+        :raises ImportError: If numpy is not available.
+        """
+        return _read_table(fn, mmap_mode=mmap_mode)
 
     def _get_statepoint_from_workspace(self, jobid):
         fn_manifest = os.path.join(self.workspace(), jobid, self.Job.FN_MANIFEST)
@@ -462,13 +776,15 @@ class Project(object):
     def get_statepoint(self, jobid, fn=None):
         """Get the statepoint associated with a job id.
 
-        The statepoint is retrieved from the workspace or
-        from the statepoints file if the former attempt fails.
+        The statepoint is retrieved from the in-memory state point cache
+        if the job's workspace directory exists, from the workspace or
+        from the statepoints file if the former attempts fail.
 
         :param jobid: A job id to get the statepoint for.
         :type jobid: str
         :param fn: The filename of the file containing the statepoints,
-            defaults to :const:`~signac.contrib.project.FN_STATEPOINTS`.
+            defaults to :const:`~signac.contrib.project.FN_STATEPOINTS`
+            and :const:`~signac.contrib.project.FN_STATEPOINTS_LEGACY`.
         :type fn: str
         :return: The statepoint.
         :rtype: dict
@@ -477,19 +793,122 @@ class Project(object):
 
         See also :meth:`dump_statepoints`.
         """
-        try:
-            statepoint = self._get_statepoint_from_workspace(jobid)
-        except KeyError:
+        if self._sp_cache is not None and jobid in self._sp_cache and \
+                os.path.isdir(os.path.join(self.workspace(), jobid)):
+            statepoint = json.loads(json.dumps(self._sp_cache[jobid]))
+        else:
             try:
-                statepoint = self.read_statepoints(fn=fn)[jobid]
-            except IOError as error:
-                if not error.errno == errno.ENOENT:
-                    raise
-                raise KeyError(jobid)
+                statepoint = self._get_statepoint_from_workspace(jobid)
+            except KeyError:
+                for sp_file in reversed(self._get_statepoints_files(fn)):
+                    try:
+                        statepoint = sp_file.get(jobid)
+                        break
+                    except KeyError:
+                        pass
+                else:
+                    raise KeyError(jobid)
         assert statepoint is not None
         assert str(self.open_job(statepoint)) == jobid
         return statepoint
 
+    def _read_cache(self):
+        "Read the persistent state point cache and its workspace mtime."
+        fn_cache = os.path.join(self.root_directory(), FN_CACHE)
+        try:
+            with gzip.open(fn_cache, 'rb') as cachefile:
+                cache = json.loads(cachefile.read().decode())
+            return cache['statepoints'], cache.get('mtime')
+        except (IOError, OSError) as error:
+            if error.errno == errno.ENOENT:
+                return dict(), None
+            logger.warning(
+                "Unable to read state point cache '{}': {}".format(fn_cache, error))
+        except (ValueError, KeyError, TypeError) as error:
+            logger.warning(
+                "State point cache '{}' is corrupted: {}".format(fn_cache, error))
+        return dict(), None
+
+    def _write_cache(self):
+        "Write the state point cache to the project root directory."
+        fn_cache = os.path.join(self.root_directory(), FN_CACHE)
+        fn_tmp = os.path.join(self.root_directory(), '._{uid}_{fn}'.format(
+            uid=uuid.uuid4(), fn=FN_CACHE))
+        blob = json.dumps(
+            {'mtime': self._sp_cache_mtime, 'statepoints': self._sp_cache})
+        try:
+            with gzip.open(fn_tmp, 'wb') as cachefile:
+                cachefile.write(blob.encode())
+            if six.PY2:
+                os.rename(fn_tmp, fn_cache)
+            else:
+                os.replace(fn_tmp, fn_cache)
+        except (IOError, OSError) as error:
+            logger.info(
+                "Unable to write state point cache '{}': {}".format(fn_cache, error))
+            try:
+                os.remove(fn_tmp)
+            except OSError:
+                pass
+        else:
+            logger.debug("Updated state point cache '{}'.".format(fn_cache))
+
+    def _get_statepoints(self, skip_errors=False, force=False):
+        """Return a mapping of job ids to state points for all initialized jobs.
+
+        The mapping is kept in memory and within the persistent state point
+        cache. The cache is validated against the modification time of the
+        workspace directory, which changes whenever jobs are added or removed.
+        Only the manifest files of jobs that are not yet cached are read.
+        The returned mapping must not be modified.
+        """
+        if self._sp_cache is None:
+            self._sp_cache, self._sp_cache_mtime = self._read_cache()
+        mtime = _get_mtime(self.workspace())
+        if mtime is None:
+            return dict()
+        if force or mtime != self._sp_cache_mtime:
+            job_ids = set(self._get_job_ids())
+            modified = force
+            for job_id in set(self._sp_cache).difference(job_ids):
+                del self._sp_cache[job_id]
+                modified = True
+            complete = True
+            for job_id in job_ids.difference(self._sp_cache):
+                try:
+                    self._sp_cache[job_id] = self._get_statepoint_from_workspace(job_id)
+                except KeyError:
+                    if not skip_errors:
+                        raise
+                    logger.critical("Unable to read state point of job '{}'.".format(job_id))
+                    complete = False
+                else:
+                    modified = True
+            stable = complete and _is_stable_mtime(mtime)
+            if modified or (stable and self._sp_cache_mtime is None):
+                self._sp_cache_mtime = mtime if stable else None
+                self._write_cache()
+            else:
+                self._sp_cache_mtime = mtime if stable else None
+        return self._sp_cache
+
+    def _sp_index(self, skip_errors=False):
+        "Generate a state point index from the state point cache."
+        return _make_sp_index(self._get_statepoints(skip_errors=skip_errors))
+
+    def update_cache(self):
+        """Update the persistent state point cache.
+
+        The state point cache is stored within the project's root directory
+        and speeds up the search for jobs with specific state point
+        parameters, e.g., with :meth:`~.find_job_ids`.
+        The cache is automatically updated whenever it is outdated, however
+        it can be useful to update it explicitly after populating a
+        large data space.
+        """
+        logger.info("Updating state point cache...")
+        self._get_statepoints(force=True)
+
     def create_linked_view(self, prefix=None, job_ids=None, index=None):
         """Create or update a persistent linked view of the selected data space.
 
@@ -532,7 +951,7 @@ class Project(object):
         if prefix is None:
             prefix = 'view'
         if index is None:
-            index = self.index(include_job_document=False)
+            index = self._sp_index()
         if job_ids is not None:
             if not isinstance(job_ids, set):
                 job_ids = set(job_ids)
@@ -636,7 +1055,8 @@ class Project(object):
             In case that a job with the same id is already
             initialized within this project.
         """
-        dst = self.open_job(job.statepoint())
+        dst = self.open_job(job._get_statepoint())
+        _flush_buffer(job.workspace())
         try:
             shutil.copytree(job.workspace(), dst.workspace())
         except OSError as error:
@@ -677,7 +1097,8 @@ class Project(object):
                     logger.info("Successfully recovered state point.")
 
     def index(self, formats=None, depth=0,
-              skip_errors=False, include_job_document=True):
+              skip_errors=False, include_job_document=True, snapshot=None,
+              workers=None):
         """Generate an index of the project's workspace.
 
         This generator function indexes every file in the project's
@@ -701,23 +1122,42 @@ class Project(object):
         :param include_job_document: Include the contents of job
             documents.
         :type include_job_document: bool
+        :param snapshot: The filename of an index snapshot for incremental
+            indexing. If provided, job index documents are only generated
+            for jobs, which were added or modified since the index was last
+            generated with the same snapshot. For removed jobs, tombstone
+            documents with a ``signac_tombstone`` key are generated. The
+            snapshot is updated after the index was generated completely.
+        :type snapshot: str
+        :param workers: The number of threads used to read the job
+            directories concurrently, which may significantly speed up
+            the indexing on file systems with high latency.
+        :type workers: int
         :yields: index documents"""
+        _flush_buffer(self.workspace())
         if formats is None:
+            sn = None if snapshot is None else _read_snapshot(snapshot)
             docs = _index_signac_project_workspace(
                 root=self.workspace(),
                 include_job_document=include_job_document,
-                fn_statepoint=self.Job.FN_MANIFEST)
+                fn_statepoint=self.Job.FN_MANIFEST,
+                fn_job_document=self.Job.FN_DOCUMENT,
+                snapshot=sn,
+                workers=workers)
         else:
             class Crawler(SignacProjectCrawler):
                 pass
             for pattern, fmt in formats.items():
                 Crawler.define(pattern, fmt)
             crawler = Crawler(self.workspace())
-            docs = crawler.crawl(depth=depth)
+            docs = crawler.crawl(depth=depth, snapshot=snapshot, workers=workers)
+            snapshot = None  # The crawler updates the snapshot.
         if skip_errors:
             docs = _skip_errors(docs, logger.critical)
         for doc in docs:
             yield doc
+        if snapshot is not None:
+            _write_snapshot(snapshot, sn)
 
     def create_access_module(self, formats=None, crawlername=None,
                              filename=None, master=True, depth=1):
@@ -853,8 +1293,185 @@ class Project(object):
         return cls(config=config)
 
 
+class _StatepointFile(object):
+    """Provide access to the statepoints stored in a JSON file by job id.
+
+    The file contains one JSON-encoded mapping of job ids to statepoints,
+    which is read completely and cached until the file is modified.
+    """
+
+    def __init__(self, fn):
+        self.fn = fn
+        self._signature = None
+        self._statepoints = None
+
+    def _load(self):
+        "Return the statepoints stored in the file."
+        stat = os.stat(self.fn)
+        signature = (stat.st_ino, stat.st_size, stat.st_mtime)
+        if signature != self._signature or self._statepoints is None:
+            with open(self.fn, 'rb') as file:
+                statepoints = json.loads(file.read().decode())
+            self._statepoints = statepoints
+            self._signature = signature if _is_stable_mtime(stat.st_mtime) else None
+        return self._statepoints
+
+    def get(self, jobid):
+        """Read the statepoint associated with the job id.
+
+        :raises KeyError: If the file does not contain the job id.
+        """
+        try:
+            statepoints = self._load()
+        except OSError as error:
+            if error.errno != errno.ENOENT:
+                raise
+            raise KeyError(jobid)
+        return json.loads(json.dumps(statepoints[jobid]))
+
+    def read(self):
+        "Read all statepoints and return them as mapping of job ids to statepoints."
+        try:
+            return json.loads(json.dumps(self._load()))
+        except OSError as error:
+            if error.errno == errno.ENOENT:
+                raise IOError(errno.ENOENT, os.strerror(errno.ENOENT), self.fn)
+            raise
+
+    def append(self, statepoints, indent=None):
+        """Add the statepoints to the file and rewrite it.
+
+        :param statepoints: A mapping of job ids to statepoints.
+        :type statepoints: Mapping
+        :param indent: The indentation of the JSON file.
+        :type indent: int
+        """
+        try:
+            tmp = self.read()
+        except IOError as error:
+            if not error.errno == errno.ENOENT:
+                raise
+            tmp = dict()
+        tmp.update(statepoints)
+        dirname = os.path.dirname(self.fn)
+        fn_tmp = os.path.join(dirname, '._{uid}_{fn}'.format(
+            uid=uuid.uuid4(), fn=os.path.basename(self.fn)))
+        with open(fn_tmp, 'w') as file:
+            file.write(json.dumps(tmp, indent=indent))
+        if six.PY2:
+            os.rename(fn_tmp, self.fn)
+        else:
+            os.replace(fn_tmp, self.fn)
+
+
+class _StatepointJournal(object):
+    """Provide random access to the statepoints stored in a journal by job id.
+
+    The file is an append-only journal, where each line is a JSON-encoded
+    mapping of one job id to its statepoint. The offset and length of the
+    line containing each job id is indexed in memory, so that a statepoint
+    is read without parsing the whole file. Lines appended to the file by
+    other processes are indexed incrementally. The job id is taken from
+    the fixed-width line prefix written by :meth:`append`; only lines in
+    a different format are decoded to be indexed.
+    """
+
+    _LINE_PREFIX = re.compile(br'\{"([0-9a-f]{32})": ')
+
+    def __init__(self, fn):
+        self.fn = fn
+        self._reset()
+
+    def _reset(self, signature=None):
+        self._signature = signature
+        self._size = 0
+        self._offsets = dict()
+
+    def _update(self):
+        "Index all lines appended to the file since the last update."
+        try:
+            stat = os.stat(self.fn)
+        except OSError as error:
+            if error.errno != errno.ENOENT:
+                raise
+            self._reset()
+            return
+        if self._signature != stat.st_ino or stat.st_size < self._size:
+            self._reset(stat.st_ino)
+        if stat.st_size == self._size:
+            return
+        with open(self.fn, 'rb') as file:
+            file.seek(self._size)
+            offset = self._size
+            for line in file:
+                if not line.endswith(b'\n'):
+                    break   # The line is still being written.
+                m = self._LINE_PREFIX.match(line)
+                if m is None:
+                    try:
+                        ids = json.loads(line.decode())
+                    except ValueError:
+                        logger.warning("Skipping corrupted line in '{}' at offset {}.".format(
+                            self.fn, offset))
+                        ids = ()
+                else:
+                    ids = (m.group(1).decode(),)
+                for _id in ids:
+                    self._offsets[_id] = (offset, len(line))
+                offset += len(line)
+        self._size = offset
+
+    def __contains__(self, jobid):
+        self._update()
+        return jobid in self._offsets
+
+    def get(self, jobid):
+        """Read the statepoint associated with the job id.
+
+        :raises KeyError: If the file does not contain the job id.
+        """
+        self._update()
+        offset, length = self._offsets[jobid]
+        with open(self.fn, 'rb') as file:
+            file.seek(offset)
+            return json.loads(file.read(length).decode())[jobid]
+
+    def read(self):
+        "Read all statepoints and return them as mapping of job ids to statepoints."
+        statepoints = dict()
+        with open(self.fn, 'rb') as file:
+            for line in file:
+                try:
+                    statepoints.update(json.loads(line.decode()))
+                except ValueError:
+                    pass    # Corrupted lines are skipped with a warning on update.
+        return statepoints
+
+    def append(self, statepoints, indent=None):
+        """Append all statepoints, which are not yet contained in the file.
+
+        :param statepoints: A mapping of job ids to statepoints.
+        :type statepoints: Mapping
+        :param indent: Ignored, each statepoint is written to a single line.
+        :type indent: int
+        """
+        self._update()
+        blob = ''.join(json.dumps({_id: sp}) + '\n'
+                       for _id, sp in statepoints.items() if _id not in self._offsets)
+        if not blob:
+            return
+        with open(self.fn, 'ab+') as file:
+            file.seek(0, os.SEEK_END)
+            if file.tell():
+                file.seek(-1, os.SEEK_END)
+                if file.read(1) != b'\n':
+                    blob = '\n' + blob
+            file.write(blob.encode())
+        self._update()
+
+
 def _find_all_links(root, leaf='job'):
-    for dirpath, dirnames, filenames in os.walk(root):
+    for dirpath, dirnames, filenames in walkdepth(root):
         for dirname in dirnames:
             if dirname == leaf:
                 yield os.path.relpath(dirpath, root)
@@ -1013,6 +1630,38 @@ def _make_paths(sp_index, leaf='job'):
         yield path, jid
 
 
+def _find_prefix(sorted_ids, prefix, limit=None):
+    "Return up to limit ids from a sorted list of ids, which start with prefix."
+    matches = []
+    for i in range(bisect_left(sorted_ids, prefix), len(sorted_ids)):
+        if limit is not None and len(matches) >= limit:
+            break
+        if not sorted_ids[i].startswith(prefix):
+            break
+        matches.append(sorted_ids[i])
+    return matches
+
+
+def _find_close_ids(sorted_ids, id, n=3, window=8):
+    """Return up to n abbreviated ids similar to id from a sorted list of ids.
+
+    The ids adjacent to the position of id within the sorted list are
+    considered first. All ids are considered if none of them is similar,
+    e.g., because of a typo within the first characters of id."""
+    i = bisect_left(sorted_ids, id)
+    candidates = sorted_ids[max(0, i - window):i + window]
+    matches = difflib.get_close_matches(id, [c[:len(id)] for c in candidates], n=n)
+    if not matches:
+        matches = difflib.get_close_matches(id, [c[:len(id)] for c in sorted_ids], n=n)
+    return matches
+
+
+def _make_sp_index(statepoints):
+    "Generate state point index documents from a mapping of job ids."
+    for job_id, statepoint in statepoints.items():
+        yield {'_id': job_id, 'statepoint': statepoint}
+
+
 def _skip_errors(iterable, log=print):
     while True:
         try:
@@ -0,0 +1,144 @@
+# Copyright (c) 2017 The Regents of the University of Michigan
+# All rights reserved.
+# This software is licensed under the BSD 3-Clause License.
+"Convert index documents into typed columns and store them in binary files."
+import os
+import io
+import json
+import zipfile
+from numbers import Number
+
+from ..common import six
+from .utility import _mkdir_p
+
+if six.PY2:
+    from collections import Mapping
+else:
+    from collections.abc import Mapping
+
+try:
+    import numpy
+except ImportError:
+    NUMPY = False
+else:
+    NUMPY = True
+
+#: The name of the column containing the document ids.
+KEY_ID = '_id'
+
+#: The supported table formats.
+FORMATS = ('npz', 'npy')
+
+FN_COLUMNS = 'columns.json'
+
+
+def _require_numpy():
+    if not NUMPY:
+        raise ImportError("You need to install numpy to use this function.")
+
+
+def _flatten(mapping, prefix=''):
+    "Yield the dotted keys and values of all leafs of a nested mapping."
+    for key, value in mapping.items():
+        if isinstance(value, Mapping) and len(value):
+            for k, v in _flatten(value, prefix + key + '.'):
+                yield k, v
+        else:
+            yield prefix + key, value
+
+
+def _get(mapping, key):
+    "Return the value of a dotted key within a nested mapping or None."
+    for k in key.split('.'):
+        if not isinstance(mapping, Mapping) or k not in mapping:
+            return None
+        mapping = mapping[k]
+    return mapping
+
+
+def _make_column(values):
+    """Convert a list of values into a typed array.
+
+    Booleans, integers and strings are stored with their respective
+    types if no value is missing. Numbers with missing values are
+    stored as floats, where missing values are NaN. All other columns
+    are stored as JSON-encoded strings, where missing values are 'null'.
+    """
+    if all(isinstance(v, bool) for v in values):
+        return numpy.array(values, dtype=bool)
+    if all(v is None or (isinstance(v, Number) and not isinstance(v, bool))
+           for v in values) and any(v is not None for v in values):
+        if all(isinstance(v, six.integer_types) for v in values):
+            try:
+                return numpy.array(values, dtype=numpy.int64)
+            except OverflowError:
+                pass
+        return numpy.array(
+            [numpy.nan if v is None else v for v in values], dtype=float)
+    if all(isinstance(v, six.string_types) for v in values):
+        return numpy.array(values, dtype=six.text_type)
+    return numpy.array([json.dumps(v) for v in values], dtype=six.text_type)
+
+
+def _make_columns(docs, keys=None):
+    """Convert documents into a mapping of column names to typed arrays.
+
+    :param docs: The documents to convert, each document requires an id.
+    :type docs: list
+    :param keys: The dotted keys of the columns, defaults to all keys of
+        all documents.
+    :type keys: list
+    :returns: A mapping of column names to arrays.
+    :rtype: dict
+    """
+    _require_numpy()
+    if keys is None:
+        keys = sorted({k for doc in docs for k, v in _flatten(doc)
+                       if k != KEY_ID})
+    columns = {KEY_ID: numpy.array(
+        [doc[KEY_ID] for doc in docs], dtype=six.text_type)}
+    for key in keys:
+        columns[key] = _make_column([_get(doc, key) for doc in docs])
+    return columns
+
+
+def _write_table(fn, columns, format='npz'):
+    """Write columns to a file.
+
+    The 'npz' format stores all columns in one file, which can be read
+    with :func:`numpy.load`. The 'npy' format stores each column in a
+    separate file within the directory fn, which allows to memory-map
+    the columns.
+    """
+    _require_numpy()
+    if format == 'npz':
+        with zipfile.ZipFile(fn, mode='w', allowZip64=True) as file:
+            for name, array in columns.items():
+                buf = io.BytesIO()
+                numpy.lib.format.write_array(buf, array)
+                file.writestr(name + '.npy', buf.getvalue())
+    elif format == 'npy':
+        _mkdir_p(fn)
+        names = sorted(columns)
+        for i, name in enumerate(names):
+            numpy.save(os.path.join(fn, '{}.npy'.format(i)), columns[name])
+        with open(os.path.join(fn, FN_COLUMNS), 'w') as file:
+            json.dump(names, file)
+    else:
+        raise ValueError(
+            "Unknown table format '{}', expected one of: {}.".format(
+                format, ', '.join(FORMATS)))
+
+
+def _read_table(fn, mmap_mode='r'):
+    "Read columns from a file written with :func:`~._write_table`."
+    _require_numpy()
+    if os.path.isdir(fn):
+        with open(os.path.join(fn, FN_COLUMNS)) as file:
+            names = json.load(file)
+        return {name: numpy.load(os.path.join(fn, '{}.npy'.format(i)),
+                                 mmap_mode=mmap_mode)
+                for i, name in enumerate(names)}
+    else:
+        with numpy.load(fn) as data:
+            return {name: data[name] for name in data.files}
@@ -4,14 +4,27 @@
 import logging
 import sys
 import os
+import re
 import getpass
 import argparse
 import errno
 
 from ..common import six
+from ..core.utility import _is_stable_mtime  # noqa
+
+try:
+    from os import scandir as _os_scandir
+except ImportError:
+    try:
+        from scandir import scandir as _os_scandir
+    except ImportError:
+        _os_scandir = None
 
 logger = logging.getLogger(__name__)
 
+# Matches the names of job directories.
+_RE_JOB_ID = re.compile('[a-f0-9]{32}')
+
 
 def query_yes_no(question, default="yes"):
     """Ask a yes/no question via input() and return their answer.
@@ -149,20 +162,89 @@ class SmartFormatter(argparse.HelpFormatter):
         return argparse.HelpFormatter._split_lines(self, text, width)
 
 
+class _DirEntry(object):
+    "Minimal replacement of os.DirEntry, if os.scandir() is not available."
+
+    def __init__(self, dirpath, name):
+        self.name = name
+        self.path = os.path.join(dirpath, name)
+
+    def is_dir(self):
+        return os.path.isdir(self.path)
+
+    def is_symlink(self):
+        return os.path.islink(self.path)
+
+
+def _scandir(path):
+    """Return the entries of the directory path.
+
+    The entries are listed with os.scandir(), which determines the type
+    of most entries without an additional stat call. If neither
+    os.scandir() nor the scandir package are available, the entries
+    are listed with os.listdir()."""
+    if _os_scandir is None:
+        return [_DirEntry(path, name) for name in os.listdir(path)]
+    else:
+        return list(_os_scandir(path))
+
+
+def _list_job_dirs(path):
+    "Return the names of all job directories within path."
+    try:
+        entries = _scandir(path)
+    except OSError as error:
+        if error.errno != errno.ENOENT:
+            raise
+        return []
+    return [entry.name for entry in entries
+            if _RE_JOB_ID.match(entry.name) and entry.is_dir()]
+
+
+def _walk(path, depth, level=0):
+    "Walk through the directory tree like os.walk() until depth."
+    try:
+        entries = _scandir(path)
+    except OSError:
+        return  # Like os.walk(), ignore directories that can't be listed.
+    dirs, files, links = [], [], set()
+    for entry in entries:
+        try:
+            is_dir = entry.is_dir()
+        except OSError:
+            is_dir = False
+        if is_dir:
+            dirs.append(entry.name)
+            if entry.is_symlink():
+                links.add(entry.name)
+        else:
+            files.append(entry.name)
+    yield path, dirs, files
+    if depth == 0 or level < depth:
+        # Symbolic links to directories are not followed.
+        for name in dirs:
+            if name not in links:
+                for p in _walk(os.path.join(path, name), depth, level + 1):
+                    yield p
+
+
 def walkdepth(path, depth=0):
+    """Walk through the directory tree of path until the specified depth.
+
+    Equivalent to :func:`os.walk`, except that directories below the
+    specified depth are not listed. A depth of 0 specifies no limit.
+    Like with :func:`os.walk`, the list of directory names may be
+    modified in place to prune the walk.
+    """
     if depth == 0:
-        for p in os.walk(path):
+        for p in _walk(path, depth):
             yield p
     elif depth > 0:
         path = path.rstrip(os.path.sep)
         if not os.path.isdir(path):
             raise OSError("Not a directory: '{}'.".format(path))
-        num_sep = path.count(os.path.sep)
-        for root, dirs, files in os.walk(path):
-            yield root, dirs, files
-            num_sep_this = root.count(os.path.sep)
-            if num_sep + depth <= num_sep_this:
-                del dirs[:]
+        for p in _walk(path, depth):
+            yield p
     else:
         raise ValueError("The value of depth must be non-negative.")
 
@@ -175,6 +257,15 @@ def _mkdir_p(path):
             raise
 
 
+def _get_mtime(path):
+    "Return the modification time of path or None if it does not exist."
+    try:
+        return os.stat(path).st_mtime
+    except OSError as error:
+        if error.errno != errno.ENOENT:
+            raise
+
+
 def is_string(s):
     if six.PY2:
         return isinstance(s, basestring)  # noqa
@@ -35,9 +35,14 @@ class AttrDict(object):
         nested_dict = dict(a=dict(b=0))
         ad = AttrDict(nested_dict)
         assert ad.a.b == 0
+
+    The callback is called with the converted data whenever the mapping
+    or any of its nested mappings is modified.
     """
     def __init__(self, mapping=None, cb=None):
         self._cb = cb
+        self._buffered_depth = 0
+        self._buffered_modified = False
         self._data_ = dict()
         if mapping is not None:
             with self._no_callback():
@@ -47,7 +52,13 @@ class AttrDict(object):
         return repr(self._data)
 
     def _modified(self, value=None):
-        if self._cb is not None:
+        if self._buffered_depth:
+            super(AttrDict, self).__setattr__('_buffered_modified', True)
+        elif isinstance(getattr(self._cb, '__self__', None), AttrDict):
+            # Nested mappings only notify their parent, the data
+            # is converted once by the outermost mapping.
+            self._cb()
+        elif self._cb is not None:
             self._cb(convert_to_dict(self._data))
 
     def _invalidate(self):
@@ -110,6 +121,26 @@ class AttrDict(object):
         self._modified()
         return ret
 
+    @contextmanager
+    def _buffered(self):
+        """Trigger the callback only once for all modifications.
+
+        The callback is not triggered if the context is exited due to
+        an exception."""
+        depth = self._buffered_depth
+        super(AttrDict, self).__setattr__('_buffered_depth', depth + 1)
+        try:
+            yield self
+        except BaseException:
+            super(AttrDict, self).__setattr__('_buffered_depth', depth)
+            if depth == 0:
+                super(AttrDict, self).__setattr__('_buffered_modified', False)
+            raise
+        super(AttrDict, self).__setattr__('_buffered_depth', depth)
+        if depth == 0 and self._buffered_modified:
+            super(AttrDict, self).__setattr__('_buffered_modified', False)
+            self._modified()
+
     @contextmanager
     def _no_callback(self):
         "Manipulate data without triggering a callback."
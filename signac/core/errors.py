@@ -5,3 +5,14 @@
 
 class Error(Exception):
     pass
+
+
+class BufferConflictError(Error, RuntimeError):
+    "The file of a buffered dict was modified by another process."
+    def __init__(self, filename):
+        self.filename = filename
+        "The filename of the modified file."
+
+    def __str__(self):
+        return "The file '{}' was modified while it was buffered.".format(
+            self.filename)
@@ -6,8 +6,13 @@ import os
 import errno
 import logging
 import uuid
+import threading
+from contextlib import contextmanager
+from multiprocessing.pool import ThreadPool
 
 from ..common import six
+from .utility import _is_stable_mtime
+from .errors import BufferConflictError
 
 if six.PY2:
     from UserDict import UserDict as UD
@@ -21,18 +26,200 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+#: The default maximum size of all buffered files in bytes.
+DEFAULT_BUFFER_SIZE = 32 * 2**20
+
+# The write buffers are local to each thread.
+_LOCAL = threading.local()
+
 if not six.PY3:
     class UserDict(UD, object):  # noqa
         pass
 
 
+def _stat_signature(filename):
+    "Return the (inode, size, mtime) signature of filename or None."
+    try:
+        stat = os.stat(filename)
+    except OSError as error:
+        if error.errno != errno.ENOENT:
+            raise
+    else:
+        return stat.st_ino, stat.st_size, stat.st_mtime
+
+
+def _write(filename, blob):
+    with open(filename, 'wb') as file:
+        file.write(blob)
+
+
+def _write_with_concern(filename, blob):
+    logger.debug("Storing with write concern to '{}'.".format(filename))
+    dirname, fn = os.path.split(filename)
+    fn_tmp = os.path.join(dirname, '._{uid}_{fn}'.format(
+        uid=uuid.uuid4(), fn=fn))
+    with open(fn_tmp, 'wb') as tmpfile:
+        tmpfile.write(blob)
+    if six.PY2:
+        os.rename(fn_tmp, filename)
+    else:
+        os.replace(fn_tmp, filename)
+
+
+class _WriteBuffer(object):
+    "Buffer the contents of files, which are written at once on flush."
+
+    def __init__(self, buffer_size=None, workers=None):
+        self.buffer_size = buffer_size
+        self.workers = workers
+        self._files = dict()
+        self._size = 0
+
+    def get(self, filename):
+        "Return the buffered content of filename or None."
+        if filename in self._files:
+            return self._files[filename][0]
+
+    def store(self, filename, blob, write_concern):
+        if filename in self._files:
+            self._size -= len(self._files[filename][0])
+        self._files[filename] = blob, write_concern
+        self._size += len(blob)
+        if self.buffer_size is not None and self._size > self.buffer_size:
+            logger.debug("Buffer size exceeded, flushing buffer.")
+            self.flush()
+
+    def _pop(self, dirname=None):
+        if dirname is None:
+            files = self._files
+            self._files = dict()
+        else:
+            prefix = os.path.join(dirname, '')
+            files = {fn: self._files.pop(fn) for fn in list(self._files)
+                     if fn.startswith(prefix)}
+        self._size -= sum(len(blob) for blob, _ in files.values())
+        return files
+
+    def discard(self, dirname=None):
+        "Discard all buffered files or only those within dirname."
+        self._pop(dirname)
+
+    def flush(self, dirname=None):
+        "Write all buffered files or only those within dirname."
+        files = self._pop(dirname)
+        if not files:
+            return
+        logger.debug("Flushing {} buffered files.".format(len(files)))
+        if self.workers is not None and self.workers > 1 and len(files) > 1:
+            pool = ThreadPool(self.workers)
+            try:
+                for _ in pool.imap_unordered(_write_buffered, files.items()):
+                    pass
+            finally:
+                pool.terminate()
+        else:
+            for item in files.items():
+                _write_buffered(item)
+
+
+def _write_buffered(item):
+    filename, (blob, write_concern) = item
+    if write_concern:
+        _write_with_concern(filename, blob)
+    else:
+        _write(filename, blob)
+
+
+@contextmanager
+def buffer_writes(buffer_size=DEFAULT_BUFFER_SIZE, workers=None):
+    """Context manager to buffer the writes of all synchronized JSON dicts.
+
+    All files written within this context are kept in memory and written
+    at once when exiting the context. Like with :meth:`JSonDict.buffered`,
+    buffered files are discarded if the context is exited due to an
+    exception. Buffered files are flushed early, when the size of all
+    buffered files exceeds the buffer size; files that were flushed early
+    are not restored on exception. Nested contexts have no effect.
+
+    The buffer is local to the thread that entered the context; writes of
+    other threads are neither buffered nor discarded. Buffering reduces
+    the number of write operations, but the durability of the written
+    files is unchanged, they are not synchronized to disk with fsync.
+
+    :param buffer_size: The maximum size of all buffered files in bytes
+        or None for no limit.
+    :type buffer_size: int
+    :param workers: The number of threads used to write the files.
+    :type workers: int
+    """
+    if _get_buffer() is not None:
+        yield
+        return
+    buffer = _LOCAL.buffer = _WriteBuffer(
+        buffer_size=buffer_size, workers=workers)
+    try:
+        yield
+    except BaseException:
+        _LOCAL.buffer = None
+        buffer.discard()
+        raise
+    _LOCAL.buffer = None
+    buffer.flush()
+
+
+def _get_buffer():
+    "Return the write buffer of the current thread or None."
+    return getattr(_LOCAL, 'buffer', None)
+
+
+def _flush_buffer(dirname, discard=False):
+    "Flush or discard all buffered files within dirname."
+    buffer = _get_buffer()
+    if buffer is not None:
+        if discard:
+            buffer.discard(dirname)
+        else:
+            buffer.flush(dirname)
+
+
 class JSonDict(UserDict):
+    """A dict, which is stored in a JSON file.
+
+    A synchronized dict loads the file before each access and saves
+    it after each modification. With write concern, the file is first
+    written to a temporary file, which then replaces the original file.
+
+    A cached dict only reloads the file if its stat signature, that
+    means the inode, size and modification time, changed since it
+    was last loaded. Files that were modified within the last few
+    seconds are always reloaded, because their modification time
+    is not precise enough to detect subsequent modifications.
 
-    def __init__(self, filename, synchronized=False, write_concern=False):
+    Use :meth:`~.buffered` to load and save a synchronized dict only
+    once for a sequence of operations. Within a :func:`~.buffer_writes`
+    context, all dicts are saved to memory and only written to disk
+    when the context is exited.
+
+    :param filename: The filename of the JSON file.
+    :type filename: str
+    :param synchronized: Synchronize the dict with the file.
+    :type synchronized: bool
+    :param write_concern: Save the file atomically.
+    :type write_concern: bool
+    :param cached: Skip loading the file if it did not change.
+    :type cached: bool
+    """
+
+    def __init__(self, filename, synchronized=False, write_concern=False,
+                 cached=False):
         self.data = dict()
         self._filename = filename
         self._synchronized = synchronized
         self._write_concern = write_concern
+        self._cached = cached
+        self._signature = None
+        self._buffered = 0
+        self._buffer_modified = False
         if self._synchronized:
             self.load()
 
@@ -79,11 +266,28 @@ class JSonDict(UserDict):
                 self.data[key] = mapping[key]
 
     def load(self):
+        if self._buffered:
+            return
+        buffer = _get_buffer()
+        if buffer is not None:
+            blob = buffer.get(self._filename)
+            if blob is not None:
+                self.data.clear()
+                self.data.update(json.loads(blob.decode()))
+                return
+        if self._cached:
+            signature = _stat_signature(self._filename)
+            if signature is not None and signature == self._signature:
+                return
+            self._signature = None
         try:
             logger.debug("Loading from file '{}'.".format(self._filename))
             with open(self._filename, 'rb') as file:
                 self.data.clear()
                 self.data.update(json.loads(file.read().decode()))
+            if self._cached and signature is not None and \
+                    _is_stable_mtime(signature[2]):
+                self._signature = signature
         except ValueError:
             logger.critical(
                 "Document file '{}' seems to be corrupted! Unable "
@@ -98,28 +302,74 @@ class JSonDict(UserDict):
         return json.dumps(self.data)
 
     def _save(self):
-        with open(self._filename, 'wb') as file:
-            file.write(self._dump().encode())
+        _write(self._filename, self._dump().encode())
 
     def _save_with_concern(self):
-        logger.debug(
-            "Storing with write concern to '{}'.".format(self._filename))
-        dirname, filename = os.path.split(self._filename)
-        fn_tmp = os.path.join(dirname, '._{uid}_{fn}'.format(
-            uid=uuid.uuid4(), fn=filename))
-        with open(fn_tmp, 'wb') as tmpfile:
-            tmpfile.write(self._dump().encode())
-        if six.PY2:
-            os.rename(fn_tmp, self._filename)
-        else:
-            os.replace(fn_tmp, self._filename)
+        _write_with_concern(self._filename, self._dump().encode())
 
     def save(self):
-        if self._write_concern:
+        if self._buffered:
+            self._buffer_modified = True
+            return
+        self._signature = None
+        buffer = _get_buffer()
+        if buffer is not None:
+            buffer.store(
+                self._filename, self._dump().encode(), self._write_concern)
+        elif self._write_concern:
             return self._save_with_concern()
         else:
             return self._save()
 
+    @contextmanager
+    def buffered(self, check_conflicts=False):
+        """Context manager to buffer all reads and writes.
+
+        The file is loaded once when entering the context and all
+        modifications are saved at once when exiting it:
+
+        .. code-block:: python
+
+            with job.document.buffered():
+                for key, value in results.items():
+                    job.document[key] = value
+
+        Modifications are not saved if the context is exited due to
+        an exception. Buffered contexts may be nested, in which case
+        the file is only saved when the outermost context is exited.
+
+        :param check_conflicts: Raise an error instead of saving the file,
+            if it was modified by another process in the meantime.
+        :type check_conflicts: bool
+        :raises BufferConflictError: If check_conflicts is True and the
+            file was modified while it was buffered.
+        """
+        if self._buffered:
+            self._buffered += 1
+            try:
+                yield self
+            finally:
+                self._buffered -= 1
+            return
+        signature = _stat_signature(self._filename)
+        if self._synchronized:
+            self.load()
+        self._buffered = 1
+        self._buffer_modified = False
+        try:
+            yield self
+        except BaseException:
+            self._signature = None  # reload on next access
+            raise
+        finally:
+            self._buffered = 0
+        if self._buffer_modified:
+            if check_conflicts and \
+                    _stat_signature(self._filename) != signature:
+                self._signature = None
+                raise BufferConflictError(self._filename)
+            self.save()
+
     def __len__(self):
         if self._synchronized:
             self.load()
@@ -3,6 +3,12 @@
 # This software is licensed under the BSD 3-Clause License.
 import re
 import subprocess
+import time
+
+# Modification times, which are less than this number of seconds in the past,
+# are not trusted for cache validation, because a subsequent modification
+# may not alter the time stamp on file systems with a coarse time resolution.
+_MTIME_RESOLUTION = 2.0
 
 
 def get_subject_from_certificate(fn_certificate):
@@ -19,6 +25,11 @@ def get_subject_from_certificate(fn_certificate):
         return lines[0][len('subject='):].strip()
 
 
+def _is_stable_mtime(mtime):
+    "Return True if mtime is old enough to be used for cache validation."
+    return mtime is not None and time.time() - mtime > _MTIME_RESOLUTION
+
+
 class Version(dict):
     """Utility class to manage revision control numbers."""
 
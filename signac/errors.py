@@ -3,6 +3,7 @@
 # This software is licensed under the BSD 3-Clause License.
 
 from .core.errors import Error
+from .core.errors import BufferConflictError
 
 from .common.errors import ConfigError
 from .common.errors import AuthenticationError
@@ -14,6 +15,7 @@ from .contrib.errors import DestinationExistsError
 
 __all__ = [
     'Error',
+    'BufferConflictError',
     'ConfigError',
     'AuthenticationError',
     'ExportError',
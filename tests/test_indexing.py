@@ -47,6 +47,30 @@ def get_crawlers(root):
 """
 
 
+SIGNAC_ACCESS_MODULE_BROKEN = SIGNAC_ACCESS_MODULE + """
+
+class BrokenCrawler(Crawler):
+
+    def crawl(self, depth=0):
+        raise RuntimeError("broken")
+
+def get_crawlers(root):
+    return {'broken': BrokenCrawler(root), 'main': Crawler(root)}
+"""
+
+
+class AnnotatingMasterCrawler(indexing.MasterCrawler):
+
+    def __init__(self, root, annotation):
+        self.annotation = annotation
+        super(AnnotatingMasterCrawler, self).__init__(root=root)
+
+    def docs_from_file(self, dirpath, fn):
+        for doc in super(AnnotatingMasterCrawler, self).docs_from_file(dirpath, fn):
+            doc['annotation'] = self.annotation
+            yield doc
+
+
 class TestFormat(object):
 
     def read(self):
@@ -162,6 +186,37 @@ class IndexingBaseTest(unittest.TestCase):
         with self.assertRaises(NotImplementedError):
             crawler.docs_from_file(None, None)
 
+    def test_walkdepth(self):
+        from signac.contrib.utility import walkdepth
+        root = self._tmp_dir.name
+        os.makedirs(os.path.join(root, 'a', 'b', 'c'))
+        os.makedirs(os.path.join(root, 'd'))
+        for dirpath in ('', 'a', os.path.join('a', 'b', 'c')):
+            with open(os.path.join(root, dirpath, 'file.txt'), 'w'):
+                pass
+        os.symlink(os.path.join(root, 'a'), os.path.join(root, 'd', 'link'))
+
+        def normalize(walk):
+            return sorted((dirpath, sorted(dirs), sorted(files))
+                          for dirpath, dirs, files in walk)
+
+        self.assertEqual(normalize(walkdepth(root)), normalize(os.walk(root)))
+        self.assertEqual(
+            [p[0] for p in sorted(walkdepth(root, 1))],
+            [root, os.path.join(root, 'a'), os.path.join(root, 'd')])
+        self.assertEqual(len(list(walkdepth(root, 2))), 4)
+        self.assertEqual(normalize(walkdepth(root, 3)), normalize(os.walk(root)))
+        pruned = []
+        for dirpath, dirs, files in walkdepth(root):
+            pruned.append(dirpath)
+            dirs[:] = [d for d in dirs if d != 'a']
+        self.assertEqual(sorted(pruned), [root, os.path.join(root, 'd')])
+        self.assertEqual(list(walkdepth(os.path.join(root, 'nonexistent'))), [])
+        with self.assertRaises(OSError):
+            list(walkdepth(os.path.join(root, 'nonexistent'), 1))
+        with self.assertRaises(ValueError):
+            list(walkdepth(root, -1))
+
     def test_regex_file_crawler_pre_compiled(self):
         self.setup_project()
 
@@ -216,6 +271,152 @@ class IndexingBaseTest(unittest.TestCase):
         with self.assertRaises(errors.FetchError):
             crawler.fetch({'filename': 'shouldnotmatch'})
 
+    def test_regex_file_crawler_multiple_definitions(self):
+        self.setup_project()
+
+        class Crawler(indexing.RegexFileCrawler):
+            pass
+
+        for i in range(20):
+            Crawler.define(r'.*b_{}\.txt'.format(i), TestFormat)
+        Crawler.define(r'.*a_(?P<a>\d)\.txt', TestFormat)
+        Crawler.define(r'.*a_(?P<b>\d)\.(?P<ext>json|txt)', 'TextFile')
+        crawler = Crawler(root=self._tmp_dir.name)
+        self.assertIsNotNone(crawler._get_matcher()._combined)
+        docs = list(crawler.crawl())
+        self.assertEqual(len(docs), 6)
+        self.assertEqual(len([doc for doc in docs if 'a' in doc]), 2)
+        self.assertEqual(len([doc for doc in docs if doc.get('ext') == 'txt']), 2)
+        for doc in docs:
+            if 'a' in doc:
+                self.assertEqual(doc['format'], str(TestFormat))
+            elif doc['ext'] == 'json':
+                with crawler.fetch(doc) as file:
+                    self.assertEqual(json.load(file)['a'], doc['b'])
+
+        # Definitions with back references are matched one by one.
+        Crawler.define(r'.*(?P<c>a)_\d\.(?P=c).*', TestFormat)
+        self.assertIsNone(crawler._get_matcher()._combined)
+        self.assertEqual(len(list(crawler.crawl())), 6)
+        self.assertEqual(len(Crawler(root=self._tmp_dir.name).definitions), 23)
+
+    def test_regex_file_crawler_hash_cache(self):
+        self.setup_project()
+        fns = [os.path.join(self._tmp_dir.name, 'a_{}.txt'.format(i)) for i in range(2)]
+        for fn in fns:
+            os.utime(fn, (0, 0))
+
+        class Crawler(indexing.RegexFileCrawler):
+            fn_hash_cache = '.hash_cache.json'
+
+        Crawler.define(r'.*a_(?P<a>\d)\.txt', 'TextFile')
+        crawler = Crawler(root=self._tmp_dir.name)
+        docs = {doc['a']: doc for doc in crawler.crawl()}
+        for doc in docs.values():
+            with open(os.path.join(doc['root'], doc['filename']), 'rb') as file:
+                self.assertEqual(doc['file_id'], indexing.md5(file))
+            self.assertEqual(doc['md5'], doc['file_id'])
+        fn_cache = os.path.join(self._tmp_dir.name, Crawler.fn_hash_cache)
+        with open(fn_cache) as file:
+            cache = json.load(file)
+        self.assertEqual(len(cache), 2)
+        # Unchanged files are not read again.
+        for entry in cache.values():
+            entry[-1] = 'cached'
+        with open(fn_cache, 'w') as file:
+            json.dump(cache, file)
+        self.assertEqual({doc['file_id'] for doc in crawler.crawl()}, {'cached'})
+        # Modified files are hashed again, but not cached while their mtime is unstable.
+        with open(fns[0], 'w') as file:
+            file.write('{"a": 10}')
+        docs = {doc['a']: doc for doc in crawler.crawl()}
+        self.assertNotEqual(docs[0]['file_id'], 'cached')
+        self.assertEqual(docs[1]['file_id'], 'cached')
+        with open(fn_cache) as file:
+            self.assertEqual(len(json.load(file)), 1)
+
+        Crawler.hash_algorithm = 'sha1'
+        for doc in crawler.crawl():
+            self.assertEqual(doc['sha1'], doc['file_id'])
+            self.assertEqual(len(doc['file_id']), 40)
+
+    def test_regex_file_crawler_hash_cache_not_indexed(self):
+        self.setup_project()
+        root = os.path.join(self._tmp_dir.name, 'root')
+        os.mkdir(root)
+        with open(os.path.join(root, 'a.txt'), 'w') as file:
+            file.write('a')
+
+        class Crawler(indexing.RegexFileCrawler):
+            fn_hash_cache = '.hash_cache.json'
+
+        Crawler.define(r'.*', 'TextFile')
+        crawler = Crawler(root=root)
+        for i in range(2):
+            docs = list(crawler.crawl())
+            self.assertEqual([doc['filename'] for doc in docs], ['a.txt'])
+        self.assertTrue(os.path.isfile(os.path.join(root, Crawler.fn_hash_cache)))
+        os.remove(os.path.join(root, Crawler.fn_hash_cache))
+        # The hash cache may be stored outside of the root directory.
+        fn_cache = os.path.join(self._tmp_dir.name, 'hash_cache.json')
+        Crawler.fn_hash_cache = fn_cache
+        self.assertEqual(list(crawler.crawl()), docs)
+        self.assertTrue(os.path.isfile(fn_cache))
+
+    def test_regex_file_crawler_workers(self):
+        self.setup_project()
+        for i in range(2, 10):
+            with open(os.path.join(self._tmp_dir.name, 'a_{}.txt'.format(i)), 'w') as file:
+                file.write(str(i) * 1000)
+
+        class Crawler(indexing.RegexFileCrawler):
+            fn_hash_cache = '.hash_cache.json'
+
+        Crawler.define(r'.*a_(?P<a>\d)\.txt', 'TextFile')
+        crawler = Crawler(root=self._tmp_dir.name)
+        docs = list(crawler.crawl())
+        self.assertEqual(len(docs), 10)
+        self.assertEqual(list(crawler.crawl(workers=4)), docs)
+        crawler = indexing.MasterCrawler(root=self._tmp_dir.name)
+        self.assertEqual(list(crawler.crawl(workers=2)), list(crawler.crawl()))
+        # Only a bounded number of files is submitted ahead of the results.
+        started = []
+
+        class RecordingCrawler(indexing.BaseCrawler):
+
+            def docs_from_file(self, dirpath, fn):
+                started.append(fn)
+                return iter(())
+
+        crawler = RecordingCrawler(root=self._tmp_dir.name)
+        next(crawler._docs_from_files(depth=0, workers=2))
+        self.assertLessEqual(len(started), 8)
+        self.assertGreater(len(os.listdir(self._tmp_dir.name)), 8)
+        # Errors while walking the directory tree are raised.
+        crawler = Crawler(root=os.path.join(self._tmp_dir.name, 'missing'))
+        for workers in (None, 2):
+            with self.assertRaises(OSError):
+                list(crawler.crawl(depth=1, workers=workers))
+
+    def test_regex_file_crawler_defer_file_id(self):
+        self.setup_project()
+
+        class Crawler(indexing.RegexFileCrawler):
+            defer_file_id = True
+
+        Crawler.define(r'.*a_(?P<a>\d)\.txt', 'TextFile')
+        crawler = Crawler(root=self._tmp_dir.name)
+        index = self.get_index_collection()
+        mirror = TestFS()
+        for doc in crawler.crawl():
+            self.assertIsNone(doc['file_id'])
+            signac.export_one(doc, index)
+            self.assertIsNone(index.find_one({'_id': doc['_id']})['file_id'])
+            signac.export_one(doc, index, mirrors=[mirror])
+            self.assertEqual(index.find_one({'_id': doc['_id']})['md5'], doc['file_id'])
+            with mirror.get(doc['file_id']):
+                pass
+
     def test_regex_file_crawler_inheritance(self):
         self.setup_project()
 
@@ -268,6 +469,39 @@ class IndexingBaseTest(unittest.TestCase):
                 pass
         self.assertFalse(no_find)
 
+    def test_master_crawler_processes(self):
+        for i in range(3):
+            project_dir = os.path.join(self._tmp_dir.name, 'project_{}'.format(i))
+            os.mkdir(project_dir)
+            for a in range(2):
+                with open(os.path.join(project_dir, 'a_{}.txt'.format(a)), 'w') as file:
+                    json.dump(dict(a=a), file)
+            with open(os.path.join(project_dir, 'signac_access.py'), 'w') as module:
+                module.write(SIGNAC_ACCESS_MODULE_BROKEN if i == 0 else SIGNAC_ACCESS_MODULE)
+        crawler = indexing.MasterCrawler(root=self._tmp_dir.name)
+        crawler.tags = {'test1'}
+        logging.disable(logging.ERROR)
+        try:
+            docs = sorted(crawler.crawl(), key=lambda doc: doc['_id'])
+            docs_processes = sorted(crawler.crawl(processes=2), key=lambda doc: doc['_id'])
+        finally:
+            logging.disable(logging.NOTSET)
+        # The broken slave crawler does not prevent the other crawlers from being executed.
+        self.assertEqual(len(docs), 6)
+        self.assertEqual(docs_processes, docs)
+        self.assertEqual(
+            set(doc['project'] for doc in docs),
+            {'project_{}'.format(i) for i in range(3)})
+        crawler = AnnotatingMasterCrawler(root=self._tmp_dir.name, annotation='test')
+        crawler.tags = {'test1'}
+        logging.disable(logging.ERROR)
+        try:
+            docs = list(crawler.crawl(processes=2))
+        finally:
+            logging.disable(logging.NOTSET)
+        self.assertEqual(len(docs), 6)
+        self.assertTrue(all(doc['annotation'] == 'test' for doc in docs))
+
     def test_fetch(self):
         with self.assertRaises(ValueError):
             signac.fetch(None)
@@ -13,6 +13,7 @@ import random
 import signac.contrib
 import signac.common.config
 from signac.common import six
+from signac.contrib.hashing import calc_id, calc_ids
 
 if six.PY2:
     from tempdir import TemporaryDirectory
@@ -110,6 +111,19 @@ class JobIDTest(BaseJobTest):
             self.assertEqual(
                 str(self.project.open_job(nested_dict())), NESTED_HASH)
 
+    def test_calc_ids(self):
+        builtins = list(BUILTINS)
+        specs = [p for p, h in builtins] + [builtins_dict(), nested_dict()]
+        ids = [h for p, h in builtins] + [BUILTINS_HASH, NESTED_HASH]
+        self.assertEqual([calc_id(spec) for spec in specs], ids)
+        self.assertEqual(calc_ids(specs), ids)
+        self.assertEqual(calc_ids(iter(specs), processes=2), ids)
+        self.assertEqual(calc_ids([]), [])
+        statepoints = [{'a': i, 'b': {'c': [i, float(i), str(i)]}} for i in range(10)]
+        self.assertEqual(
+            calc_ids(statepoints),
+            [str(self.project.open_job(sp)) for sp in statepoints])
+
     def test_sequences_identity(self):
         job1 = self.project.open_job({'a': [1.0, '1.0', 1, True]})
         job2 = self.project.open_job({'a': (1.0, '1.0', 1, True)})
@@ -129,6 +143,16 @@ class JobTest(BaseJobTest):
         job = self.project.open_job({'a': 0})
         self.assertEqual(str(job), job.get_id())
 
+    def test_statepoint_copy(self):
+        sp = {'a': 0, 'b': {'c': [1, 2]}}
+        job = self.project.open_job(sp)
+        sp['b']['c'].append(3)
+        self.assertEqual(job.statepoint(), {'a': 0, 'b': {'c': [1, 2]}})
+        job_sp = job.statepoint()
+        job_sp['b']['c'].append(3)
+        self.assertEqual(job.statepoint(), {'a': 0, 'b': {'c': [1, 2]}})
+        self.assertIsNot(job.statepoint(), job.statepoint())
+
     def test_isfile(self):
         job = self.project.open_job({'a': 0})
         fn = 'test.txt'
@@ -232,6 +256,41 @@ class JobSPInterfaceTest(BaseJobTest):
         with self.assertRaises(KeyError):
             job.sp.b
 
+    def test_interface_buffered(self):
+        job = self.open_job(dict(a=0, b=dict(c=0)))
+        job.init()
+        id_0 = job.get_id()
+        resets = []
+        reset_statepoint = job.reset_statepoint
+
+        def count_resets(new_statepoint):
+            resets.append(new_statepoint)
+            reset_statepoint(new_statepoint)
+        job.reset_statepoint = count_resets
+        with job.buffered_sp() as sp:
+            sp.a = 1
+            sp.b.c = 1
+            with job.buffered_sp():
+                sp.d = 1
+            self.assertEqual(job.get_id(), id_0)
+        self.assertEqual(len(resets), 1)
+        self.assertNotEqual(job.get_id(), id_0)
+        self.assertEqual(job.statepoint(), dict(a=1, b=dict(c=1), d=1))
+        self.assertEqual(job, self.open_job(dict(a=1, b=dict(c=1), d=1)))
+        self.assertTrue(job.isfile(job.FN_MANIFEST))
+        job.sp.b.c = 2
+        self.assertEqual(len(resets), 2)
+        self.assertEqual(job.statepoint()['b'], dict(c=2))
+        id_1 = job.get_id()
+        with self.assertRaises(ValueError):
+            with job.buffered_sp() as sp:
+                sp.a = 2
+                raise ValueError()
+        self.assertEqual(len(resets), 2)
+        self.assertEqual(job.get_id(), id_1)
+        self.assertEqual(job.sp.a, 1)
+        self.assertEqual(job.statepoint()['a'], 1)
+
     def test_interface_destination_conflict(self):
         job_a = self.open_job(dict(a=0))
         job_b = self.open_job(dict(b=0))
@@ -417,6 +476,17 @@ class JobDocumentTest(BaseJobTest):
         self.assertEqual(job.document.get(key), d)
         self.assertEqual(job.document.get('bs', d), d)
 
+    def test_buffered(self):
+        job = self.open_job(test_token)
+        with job.document.buffered():
+            for i in range(30):
+                job.document[str(i)] = i
+            self.assertFalse(job.isfile(job.FN_DOCUMENT))
+        self.assertTrue(job.isfile(job.FN_DOCUMENT))
+        job2 = self.open_job(test_token)
+        self.assertEqual(len(job2.document), 30)
+        self.assertEqual(job2.document['29'], 29)
+
     def test_copy_document(self):
         key = 'get_set'
         d = testdata()
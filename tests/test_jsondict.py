@@ -4,8 +4,11 @@
 import os
 import unittest
 import uuid
+from threading import Thread
 
 from signac.core.jsondict import JSonDict
+from signac.core.jsondict import buffer_writes
+from signac.errors import BufferConflictError
 from signac.common import six
 
 if six.PY2:
@@ -152,11 +155,128 @@ class SynchronizedDictTest(JSonDictTest):
         self.assertEqual(len(jsd2), 1)
         self.assertEqual(jsd2[key], d)
 
+    def test_buffered(self):
+        jsd = self.get_json_dict()
+        jsd['a'] = 0
+        with jsd.buffered():
+            for i in range(10):
+                jsd[str(i)] = i
+            with jsd.buffered():
+                jsd['b'] = 1
+            self.assertNotIn('b', self.get_json_dict())
+            self.assertEqual(jsd['b'], 1)
+        jsd2 = self.get_json_dict()
+        self.assertEqual(len(jsd2), 12)
+        self.assertEqual(jsd2['b'], 1)
+        # Modifications are discarded on error.
+        with self.assertRaises(ValueError):
+            with jsd.buffered():
+                jsd['c'] = 2
+                raise ValueError()
+        self.assertNotIn('c', jsd)
+        self.assertNotIn('c', self.get_json_dict())
+
+    def test_buffered_conflict(self):
+        jsd = self.get_json_dict()
+        jsd['a'] = 0
+        with self.assertRaises(BufferConflictError):
+            with jsd.buffered(check_conflicts=True):
+                jsd['a'] = 1
+                with open(self._fn_dict, 'w') as file:
+                    file.write('{"a": 2, "b": 3}')
+        self.assertEqual(jsd['a'], 2)
+        with jsd.buffered():
+            jsd['a'] = 1
+            with open(self._fn_dict, 'w') as file:
+                file.write('{"a": 2, "b": 3}')
+        self.assertEqual(jsd['a'], 1)
+
+    def test_buffer_writes(self):
+        jsd = self.get_json_dict()
+        jsd['a'] = 0
+        with buffer_writes():
+            jsd['a'] = 1
+            with buffer_writes():
+                jsd['b'] = 2
+            self.assertEqual(jsd['a'], 1)
+            jsd2 = self.get_json_dict()
+            self.assertEqual(jsd2['b'], 2)   # read from the buffer
+            with open(self._fn_dict) as file:
+                self.assertNotIn('b', file.read())
+        self.assertEqual(self.get_json_dict(), {'a': 1, 'b': 2})
+
+    def test_buffer_writes_early_flush(self):
+        fns = [os.path.join(self._tmp_dir.name, 'doc{}.json'.format(i))
+               for i in range(8)]
+        with buffer_writes(buffer_size=32, workers=4):
+            for i, fn in enumerate(fns):
+                jsd = JSonDict(fn, synchronized=True)
+                jsd['a'] = i   # 8 bytes
+            self.assertTrue(os.path.isfile(fns[0]))
+            self.assertFalse(os.path.isfile(fns[-1]))
+        for i, fn in enumerate(fns):
+            self.assertEqual(JSonDict(fn, synchronized=True)['a'], i)
+
+    def test_buffer_writes_discard_on_error(self):
+        jsd = self.get_json_dict()
+        jsd['a'] = 0
+        with self.assertRaises(ValueError):
+            with buffer_writes():
+                jsd['a'] = 1
+                raise ValueError()
+        self.assertEqual(self.get_json_dict()['a'], 0)
+
+    def test_buffer_writes_thread_local(self):
+        jsd = self.get_json_dict()
+        jsd['a'] = 0
+        fn = os.path.join(self._tmp_dir.name, 'other.json')
+
+        def write():
+            JSonDict(fn, synchronized=True)['b'] = 1
+        with self.assertRaises(ValueError):
+            with buffer_writes():
+                jsd['a'] = 1
+                thread = Thread(target=write)
+                thread.start()
+                thread.join()
+                self.assertTrue(os.path.isfile(fn))
+                raise ValueError()
+        self.assertEqual(self.get_json_dict()['a'], 0)
+        self.assertEqual(JSonDict(fn, synchronized=True)['b'], 1)
+
 
 class SynchronizedWithWriteConcern(SynchronizedDictTest):
 
     def get_json_dict(self):
         return JSonDict(self._fn_dict, synchronized=True, write_concern=True)
 
+
+class CachedDictTest(SynchronizedWithWriteConcern):
+
+    def get_json_dict(self):
+        return JSonDict(self._fn_dict, synchronized=True, write_concern=True,
+                        cached=True)
+
+    def test_cached_reads(self):
+        jsd = self.get_json_dict()
+        jsd['a'] = 0
+        self.assertIsNone(jsd._signature)   # recently modified
+        st = os.stat(self._fn_dict)
+        os.utime(self._fn_dict, (st.st_atime - 30, st.st_mtime - 30))
+        self.assertEqual(jsd['a'], 0)
+        self.assertIsNotNone(jsd._signature)
+        # Modifications, which preserve the stat signature, are not detected.
+        st = os.stat(self._fn_dict)
+        with open(self._fn_dict, 'r+') as file:
+            file.write('{"a": 1}')
+        os.utime(self._fn_dict, (st.st_atime, st.st_mtime))
+        self.assertEqual(jsd['a'], 0)
+        # Any other modification is detected.
+        with open(self._fn_dict, 'w') as file:
+            file.write('{"a": 2, "b": 3}')
+        self.assertEqual(jsd['a'], 2)
+        self.assertEqual(len(jsd), 2)
+
+
 if __name__ == '__main__':
     unittest.main()
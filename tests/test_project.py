@@ -4,6 +4,7 @@
 import unittest
 import os
 import uuid
+import json
 import warnings
 import logging
 
@@ -12,6 +13,10 @@ from signac.common import six
 from signac.contrib.formats import TextFile
 from signac.errors import DestinationExistsError
 from signac.contrib.project import _find_all_links
+from signac.contrib.project import FN_CACHE
+from signac.contrib.project import FN_STATEPOINTS, FN_STATEPOINTS_LEGACY
+from signac.contrib.project import _find_close_ids
+from signac.contrib.table import NUMPY
 
 from test_job import BaseJobTest
 
@@ -75,6 +80,56 @@ class ProjectTest(BaseProjectTest):
         for id_ in self.project.read_statepoints().keys():
             self.project.get_statepoint(id_)
 
+    def test_write_statepoints_journal(self):
+        fn = os.path.join(self.project.root_directory(), FN_STATEPOINTS)
+        statepoints = [{'a': i} for i in range(5)]
+        self.project.write_statepoints(statepoints)
+        self.project.write_statepoints(statepoints + [{'a': 5}])
+        with open(fn) as file:
+            lines = file.readlines()
+        self.assertEqual(len(lines), 6)
+        # Statepoints appended by another project instance are found.
+        project = signac.get_project(root=self.project.root_directory())
+        project.write_statepoints([{'b': 0}])
+        job = self.project.open_job({'b': 0})
+        self.assertEqual(self.project.get_statepoint(str(job)), {'b': 0})
+        with self.assertRaises(KeyError):
+            self.project.get_statepoint(str(self.project.open_job({'b': 1})))
+        # Lines which were written in a different format are decoded.
+        id_c = str(self.project.open_job({'c': 0}))
+        with open(fn, 'a') as file:
+            file.write(json.dumps({id_c: {'c': 0}}, separators=(',', ':')))
+        self.project.write_statepoints([{'c': 1}])
+        self.assertEqual(self.project.get_statepoint(id_c), {'c': 0})
+        self.assertEqual(len(self.project.read_statepoints()), 9)
+
+    def test_read_statepoints_legacy(self):
+        fn = os.path.join(self.project.root_directory(), FN_STATEPOINTS)
+        fn_legacy = os.path.join(self.project.root_directory(), FN_STATEPOINTS_LEGACY)
+        statepoints = [{'a': i} for i in range(5)]
+        legacy = self.project.dump_statepoints(statepoints)
+        with open(fn_legacy, 'w') as file:
+            json.dump(legacy, file, indent=2)
+        self.assertEqual(self.project.read_statepoints(), legacy)
+        for id_, sp in legacy.items():
+            self.assertEqual(self.project.get_statepoint(id_), sp)
+        self.project.write_statepoints([{'b': 0}])
+        # The legacy file is read, but not modified.
+        with open(fn_legacy) as file:
+            self.assertEqual(json.load(file), legacy)
+        with open(fn) as file:
+            self.assertEqual(len(file.readlines()), 1)
+        self.assertEqual(len(self.project.read_statepoints()), 6)
+        for id_, sp in legacy.items():
+            self.assertEqual(self.project.get_statepoint(id_), sp)
+        # Files without the journal extension are rewritten completely.
+        fn_other = os.path.join(self._tmp_dir.name, 'statepoints.json')
+        self.project.write_statepoints(statepoints, fn=fn_other)
+        self.project.write_statepoints([{'b': 0}], fn=fn_other)
+        with open(fn_other) as file:
+            self.assertEqual(len(json.load(file)), 6)
+        self.assertEqual(self.project.read_statepoints(fn=fn_other), self.project.read_statepoints())
+
     def test_find_statepoints(self):
         statepoints = [{'a': i} for i in range(5)]
         for sp in statepoints:
@@ -108,12 +163,65 @@ class ProjectTest(BaseProjectTest):
         self.assertEqual(0, len(list(self.project.find_job_ids({'a': 5}))))
         self.assertEqual(1, len(list(self.project.find_job_ids(doc_filter={'b': 0}))))
         self.assertEqual(0, len(list(self.project.find_job_ids(doc_filter={'b': 5}))))
+        self.assertEqual(3, len(list(self.project.find_job_ids({'a': {'$gt': 1}}))))
+        self.assertEqual(2, len(list(self.project.find_job_ids({'a': {'$in': [0, 4]}}))))
+        self.assertEqual(
+            2, len(list(self.project.find_job_ids(doc_filter={'b': {'$lte': 1}}))))
         for job_id in self.project.find_job_ids():
             self.assertEqual(self.project.open_job(id=job_id).get_id(), job_id)
         index = list(self.project.index())
         for job_id in self.project.find_job_ids(index=index):
             self.assertEqual(self.project.open_job(id=job_id).get_id(), job_id)
 
+    def test_job_statepoint_index(self):
+        for i in range(4):
+            self.project.open_job({'a': i, 'b': {'c': 'const'}}).init()
+        jsi = dict(self.project.build_job_statepoint_index())
+        self.assertEqual(len(jsi), 5)
+        self.assertEqual(jsi['["b", "c", "const"]'], set(self.project.find_job_ids()))
+        self.assertEqual(jsi['["a", 0]'], set(self.project.find_job_ids({'a': 0})))
+        jsi = dict(self.project.build_job_statepoint_index(exclude_const=True))
+        self.assertEqual(len(jsi), 4)
+
+    def test_job_search_index_save_load(self):
+        for i in range(5):
+            self.project.open_job({'a': i}).document['b'] = i
+        index = list(self.project.index(include_job_document=True))
+        search_index = self.project.build_job_search_index(index)
+        fn = os.path.join(self._tmp_dir.name, 'index.bin')
+        search_index.save(fn)
+        loaded = signac.contrib.project.JobSearchIndex.load(fn)
+        self.assertEqual(len(loaded), 5)
+        self.assertEqual(
+            set(loaded.find_job_ids({'a': {'$gte': 3}})),
+            set(self.project.find_job_ids({'a': {'$gte': 3}})))
+        self.assertEqual(
+            set(loaded.find_job_ids(doc_filter={'b': 0})),
+            set(self.project.find_job_ids({'a': 0})))
+
+    def test_statepoint_cache(self):
+        statepoints = [{'a': i} for i in range(5)]
+        for sp in statepoints:
+            self.project.open_job(sp).init()
+        fn_cache = os.path.join(self.project.root_directory(), FN_CACHE)
+        self.assertFalse(os.path.isfile(fn_cache))
+        self.assertEqual(1, len(list(self.project.find_job_ids({'a': 0}))))
+        self.assertTrue(os.path.isfile(fn_cache))
+        # Cached state points are not read from the workspace again.
+        with open(self.project.open_job({'a': 1}).fn(signac.contrib.job.Job.FN_MANIFEST), 'w'):
+            pass
+        project = signac.get_project(root=self.project.root_directory())
+        self.assertEqual(1, len(list(project.find_job_ids({'a': 1}))))
+        self.assertEqual(len(statepoints), len(list(project.find_statepoints())))
+        # Added and removed jobs are detected.
+        self.project.open_job({'a': 5}).init()
+        self.assertEqual(1, len(list(project.find_job_ids({'a': 5}))))
+        self.project.open_job({'a': 0}).remove()
+        self.assertEqual(0, len(list(project.find_job_ids({'a': 0}))))
+        os.remove(fn_cache)
+        project.update_cache()
+        self.assertTrue(os.path.isfile(fn_cache))
+
     def test_find_jobs(self):
         statepoints = [{'a': i} for i in range(5)]
         for sp in statepoints:
@@ -131,6 +239,149 @@ class ProjectTest(BaseProjectTest):
         docs = self.project.find_jobs()
         self.assertEqual(len(statepoints), len(self.project.find_jobs()))
 
+    def test_init_jobs(self):
+        self.assertEqual(self.project.init_jobs([]), [])
+        statepoints = [{'a': i} for i in range(10)]
+        jobs = self.project.init_jobs(statepoints[:5])
+        self.assertEqual([job.statepoint() for job in jobs], statepoints[:5])
+        self.assertEqual(5, self.project.num_jobs())
+        jobs = self.project.init_jobs(statepoints, workers=4)
+        self.assertEqual([job.statepoint() for job in jobs], statepoints)
+        self.assertEqual(len(statepoints), self.project.num_jobs())
+        for job in jobs:
+            self.assertTrue(job.isfile(job.FN_MANIFEST))
+        # The ids are calculated from the decoded statepoints.
+        statepoints = [{'a': i, 'b': {2: 0, 10: (1, 2)}} for i in range(4)]
+        jobs = self.project.init_jobs(statepoints, processes=2)
+        self.assertEqual(jobs, [self.project.open_job(sp) for sp in statepoints])
+        for job in jobs:
+            self.assertEqual(job.statepoint()['b'], {'2': 0, '10': [1, 2]})
+        # Existing manifest files are still verified.
+        with open(jobs[0].fn(jobs[0].FN_MANIFEST), 'w') as file:
+            file.write('{"a": 1}')
+        with self.assertRaises(RuntimeError):
+            self.project.init_jobs(statepoints[:1])
+
+    def test_buffered(self):
+        jobs = self.project.init_jobs([{'a': i} for i in range(10)])
+        with self.project.buffered(workers=4):
+            for job in jobs:
+                job.document['b'] = job.sp.a
+            self.assertFalse(any(job.isfile(job.FN_DOCUMENT) for job in jobs))
+            self.assertEqual(self.project.open_job({'a': 3}).document['b'], 3)
+            jobs[0].remove()
+            jobs[1].move(signac.init_project(
+                name='other', root=os.path.join(self._tmp_dir.name, 'other')))
+        self.assertFalse(jobs[0].isfile(jobs[0].FN_DOCUMENT))
+        self.assertEqual(jobs[1].document['b'], 1)
+        for job in jobs[2:]:
+            self.assertTrue(job.isfile(job.FN_DOCUMENT))
+            self.assertEqual(job.document['b'], job.sp.a)
+
+    def test_buffered_index_and_clone(self):
+        job = self.project.open_job({'a': 0})
+        job.init()
+        other = signac.init_project(
+            name='other', root=os.path.join(self._tmp_dir.name, 'other'))
+        with self.project.buffered():
+            job.document['b'] = 1
+            self.assertEqual(
+                list(self.project.find_job_ids(doc_filter={'b': 1})), [job.get_id()])
+            other.clone(job)
+        self.assertEqual(other.open_job(id=job.get_id()).document['b'], 1)
+
+    @unittest.skipIf(not NUMPY, "test requires numpy")
+    def test_export_statepoints(self):
+        import numpy
+        statepoints = [{'a': i, 'b': {'c': str(i)}} for i in range(5)]
+        statepoints.append({'a': 1.5, 'd': [0, 1]})
+        jobs = self.project.init_jobs(statepoints)
+        for job in jobs[:3]:
+            job.document['e'] = job.sp.a > 0
+        for format in ('npz', 'npy'):
+            fn = os.path.join(self._tmp_dir.name, 'table.' + format)
+            self.project.export_statepoints(fn, format=format)
+            table = self.project.read_statepoint_table(fn)
+            self.assertEqual(
+                set(table), {'_id', 'statepoint.a', 'statepoint.b.c', 'statepoint.d'})
+            self.assertEqual(list(table['_id']), sorted(str(job) for job in jobs))
+            self.assertEqual(table['statepoint.a'].dtype, float)
+            self.assertEqual(sorted(table['statepoint.a']), [0, 1, 1.5, 2, 3, 4])
+            self.assertEqual(sum(s == 'null' for s in table['statepoint.d']), 5)
+        fn = os.path.join(self._tmp_dir.name, 'filtered.npz')
+        self.project.export_statepoints(
+            fn, keys=['a'], doc_keys=['e'], filter={'a': {'$lt': 3}, 'b': {'$exists': True}})
+        table = self.project.read_statepoint_table(fn)
+        self.assertEqual(set(table), {'_id', 'statepoint.a', 'e'})
+        self.assertEqual(table['statepoint.a'].dtype, numpy.int64)
+        self.assertEqual(table['e'].dtype, bool)
+        self.assertEqual(
+            dict(zip(table['_id'], table['e'])),
+            {str(job): job.sp.a > 0 for job in jobs[:3]})
+        with self.assertRaises(ValueError):
+            self.project.export_statepoints(fn, format='parquet')
+
+    @unittest.skipIf(not NUMPY, "test requires numpy")
+    def test_to_arrays(self):
+        import numpy
+        jobs = self.project.init_jobs([{'a': i % 3, 'b': i} for i in range(9)])
+        for job in jobs:
+            job.document['c'] = 2 * job.sp.b
+        arrays = self.project.to_arrays()
+        self.assertEqual(set(arrays), {'_id', 'statepoint.a', 'statepoint.b'})
+        self.assertEqual(list(arrays['_id']), sorted(str(job) for job in jobs))
+        arrays = self.project.to_arrays(
+            keys=['a'], doc_keys=['c'], filter={'b': {'$lt': 6}})
+        self.assertEqual(set(arrays), {'_id', 'statepoint.a', 'c'})
+        self.assertEqual(len(arrays['_id']), 6)
+        for a in range(3):
+            mask = arrays['statepoint.a'] == a
+            self.assertEqual(numpy.sum(arrays['c'][mask]), 2 * (a + a + 3))
+        index = list(self.project.index())
+        jobs[0].document['c'] = -1
+        arrays = self.project.to_arrays(doc_keys=['c'], index=index)
+        self.assertEqual(sorted(arrays['c']), [2 * i for i in range(9)])
+        arrays = self.project.to_arrays(doc_filter={'c': -1})
+        self.assertEqual(list(arrays['_id']), [str(jobs[0])])
+
+    def test_open_job_lazy(self):
+        jobs = self.project.init_jobs([{'a': i} for i in range(5)])
+        for job in jobs:
+            with open(job.fn('data.txt'), 'w') as file:
+                file.write(str(job.sp.a))
+        project = signac.get_project(root=self.project.root_directory())
+        for job in project.find_jobs():
+            self.assertIsNone(job._statepoint)
+            self.assertTrue(job.isfile('data.txt'))
+            self.assertIn(job, jobs)
+        job = project.open_job(id=str(jobs[0]))
+        self.assertIsNone(job._statepoint)
+        self.assertEqual(job.statepoint(), {'a': 0})
+        self.assertEqual(job.sp.a, 0)
+        job = project.open_job(id=str(jobs[1])[:8])
+        self.assertEqual(str(job), str(jobs[1]))
+        jobs[2].remove()
+        job = project.open_job(id=str(jobs[3]))
+        jobs[3].remove()
+        with self.assertRaises(KeyError):
+            job.statepoint()
+        with self.assertRaises(KeyError):
+            project.open_job(id=str(jobs[2]))
+        project = signac.get_project(root=self.project.root_directory())
+        job = project.open_job(id=str(jobs[4]))
+        self.assertIsNone(project._job_ids)   # no listing for full ids
+        self.assertIsNone(job._statepoint)
+
+    def test_open_job_removed(self):
+        jobs = self.project.init_jobs([{'a': i} for i in range(3)])
+        self.assertEqual(len(self.project._get_statepoints()), 3)
+        jobs[0].remove()
+        with self.assertRaises(KeyError):
+            self.project.get_statepoint(str(jobs[0]))
+        with self.assertRaises(KeyError):
+            self.project.open_job(id=str(jobs[0]))
+        self.assertEqual(self.project.open_job(id=str(jobs[1])).sp.a, 1)
+
     def test_len_find_jobs(self):
         statepoints = [{'a': i, 'b': i<3} for i in range(5)]
         for sp in statepoints:
@@ -180,6 +431,21 @@ class ProjectTest(BaseProjectTest):
         with self.assertRaises(KeyError):
             self.project.open_job(id='abc')
 
+    def test_min_len_unique_id(self):
+        self.assertEqual(self.project.min_len_unique_id(), 0)
+        for i in range(50):
+            self.project.open_job({'a': i}).init()
+        job_ids = list(self.project.find_job_ids())
+        n = self.project.min_len_unique_id()
+        self.assertEqual(len(set(_id[:n] for _id in job_ids)), len(job_ids))
+        self.assertLess(len(set(_id[:n - 1] for _id in job_ids)), len(job_ids))
+        job_id = job_ids[0]
+        typo = job_id[:n] + ('0' if job_id[n] != '0' else '1')
+        self.assertIn(job_id[:n + 1], _find_close_ids(sorted(job_ids), typo))
+        # Typos within the first characters are found as well.
+        typo = '{:x}'.format((int(job_id[0], 16) + 8) % 16) + job_id[1:n + 1]
+        self.assertIn(job_id[:n + 1], _find_close_ids(sorted(job_ids), typo))
+
     def test_create_linked_view(self):
         sp_0 = [{'a': i, 'b': i % 3} for i in range(5)]
         sp_1 = [{'a': i, 'b': i % 3, 'c': {'a': i, 'b': 0}} for i in range(5)]
@@ -320,6 +586,44 @@ class ProjectTest(BaseProjectTest):
         self.assertEqual(len(docs), 2 * len(statepoints))
         self.assertEqual(len(set((doc['_id'] for doc in docs))), len(docs))
 
+    def test_index_workers(self):
+        statepoints = [{'a': i} for i in range(20)]
+        for sp in statepoints:
+            self.project.open_job(sp).document['b'] = sp['a']
+        docs = list(self.project.index())
+        self.assertEqual(docs, list(self.project.index(workers=4)))
+        crawler = signac.contrib.SignacProjectCrawler(self.project.workspace())
+        self.assertEqual(list(crawler.crawl()), list(crawler.crawl(workers=4)))
+
+    def test_index_snapshot(self):
+        statepoints = [{'a': i} for i in range(5)]
+        for sp in statepoints:
+            self.project.open_job(sp).document['test'] = True
+
+        def age(job, seconds):
+            for fn in (job.FN_MANIFEST, job.FN_DOCUMENT):
+                os.utime(job.fn(fn), (0, os.path.getmtime(job.fn(fn)) - seconds))
+
+        for job in self.project.find_jobs():
+            age(job, 60)
+        fn_snapshot = os.path.join(self._tmp_pr, 'snapshot.json')
+        docs = list(self.project.index(snapshot=fn_snapshot))
+        self.assertEqual(len(docs), len(statepoints))
+        self.assertEqual(len(list(self.project.index(snapshot=fn_snapshot))), 0)
+        self.project.open_job({'a': 0}).document['test'] = False
+        self.project.open_job({'a': 1}).remove()
+        age(self.project.open_job({'a': 0}), 30)
+        docs = list(self.project.index(snapshot=fn_snapshot))
+        self.assertEqual(len(docs), 2)
+        docs = {doc['_id']: doc for doc in docs}
+        self.assertFalse(docs[self.project.open_job({'a': 0}).get_id()]['test'])
+        self.assertTrue(docs[self.project.open_job({'a': 1}).get_id()]['signac_tombstone'])
+        self.assertEqual(len(list(self.project.index(snapshot=fn_snapshot))), 0)
+        crawler = signac.contrib.SignacProjectCrawler(self.project.workspace())
+        fn_snapshot = os.path.join(self._tmp_pr, 'snapshot_crawler.json')
+        self.assertEqual(len(list(crawler.crawl(snapshot=fn_snapshot))), len(statepoints) - 1)
+        self.assertEqual(len(list(crawler.crawl(snapshot=fn_snapshot))), 0)
+
     def test_signac_project_crawler(self):
         statepoints = [{'a': i} for i in range(5)]
         for sp in statepoints:
@@ -392,6 +696,21 @@ class ProjectTest(BaseProjectTest):
         job.init()
         self.assertIn(job, self.project)
 
+    def test_project_contains_other_instance(self):
+        project = signac.get_project(root=self.project.root_directory())
+        jobs = [self.open_job(dict(a=i)) for i in range(5)]
+        for job in jobs:
+            self.assertNotIn(job, project)
+            job.init()
+            self.assertIn(job, project)
+        self.assertEqual(len(project), len(jobs))
+        jobs[0].remove()
+        self.assertNotIn(jobs[0], project)
+        for job in jobs[1:]:
+            self.assertIn(job, project)
+            self.assertEqual(project.open_job(id=job.get_id()[:16]), job)
+        self.assertEqual(len(project), len(jobs) - 1)
+
     def test_job_move(self):
         root = self._tmp_dir.name
         project_a = signac.init_project('ProjectA', os.path.join(root, 'a'))
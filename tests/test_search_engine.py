@@ -1,9 +1,19 @@
 # Copyright (c) 2017 The Regents of the University of Michigan
 # All rights reserved.
 # This software is licensed under the BSD 3-Clause License.
+import os
+import json
 import unittest
+from numbers import Number
 
+from signac.common import six
 from signac.core.search_engine import DocumentSearchEngine as DSE
+from signac.core.search_engine import _intersection
+
+if six.PY2:
+    from tempdir import TemporaryDirectory
+else:
+    from tempfile import TemporaryDirectory
 
 TEST_INDEX = [
     {'a': 0},
@@ -83,6 +93,150 @@ class DocumentSearchEngineTest(unittest.TestCase):
         for q, result in QUERIES:
             self.assertEqual(set(e.find(q)), set(result))
 
+    def test_find_operators(self):
+        ti = self.test_index()
+        e = DSE(ti, include=None)
+        QUERIES = [
+            ({'a': {'$gte': 0}}, {0, 2, 3, 4, 5, 6}),
+            ({'a': {'$gt': 0}}, {}),
+            ({'a': {'$gt': -1}}, {0, 2, 3, 4, 5, 6}),
+            ({'b': {'$lt': 2}}, {1, 2, 3, 4}),
+            ({'b': {'$lte': 1}}, {1, 2, 3, 4}),
+            ({'b': {'$lt': 1}}, {}),
+            ({'b': {'$gt': 0.5, '$lt': 1.5}}, {1, 2, 3, 4}),
+            ({'a': 0, 'b': {'$gt': 0.5, '$lt': 1.5}}, {2, 3, 4}),
+            ({'c': {'$gt': 'abb'}}, {3, 4}),
+            ({'c': {'$gt': 'abc'}}, {}),
+            ({'a': {'$gt': 'x'}}, {}),
+            ({'a': {'$in': [0, 1]}}, {0, 2, 3, 4, 5, 6}),
+            ({'a': {'$in': []}}, {}),
+            ({'f': {'$in': [[0, 1]]}}, {5}),
+            ({'g': {'i': {'$in': ['xyz']}}}, {6}),
+            ({'a': {'$ne': 0}}, {1}),
+            ({'d': {'e': {'$ne': True}}}, {0, 1, 2, 3, 5, 6}),
+            ({'d': {'$exists': True}}, {4}),
+            ({'d': {'e': {'$exists': True}}}, {4}),
+            ({'c': {'$exists': False}}, {0, 1, 2, 5, 6}),
+        ]
+        for q, result in QUERIES:
+            self.assertEqual(set(e.find(q)), set(result))
+        with self.assertRaises(ValueError):
+            e.check_filter({'a': {'$foo': 0}})
+
+    def test_find_operators_typed_values(self):
+        docs = [
+            {'_id': 0, 'a': 1, 'x': [1, 2]},
+            {'_id': 1, 'a': True, 'x': 'abc'},
+            {'_id': 2, 'a': 2.5, 'x': {'y': 'z'}},
+            {'_id': 3, 'a': None, 'x': '[1, 2]'},
+        ]
+        for compact in (False, True):
+            for order in (docs, docs[::-1]):
+                e = DSE(order, compact=compact)
+                self.assertEqual(e._sorted_values, dict())
+                # Booleans are not numbers and lists are not strings.
+                self.assertEqual(set(e.find({'a': {'$gt': 0}})), {0, 2})
+                self.assertEqual(set(e.find({'a': {'$lte': 1}})), {0})
+                self.assertEqual(set(e.find({'x': {'$lt': 'zzz'}})), {1, 3})
+                self.assertEqual(set(e.find({'x': {'$lt': '[2'}})), {3})
+                self.assertEqual(set(e.find({'x': {'y': {'$gte': 'z'}}})), {2})
+        # Range queries use the postings of the hash index.
+        e = DSE(docs[:1] + docs[2:3], compact=True)
+        self.assertEqual(e._ranged, dict())
+        values, postings = e._get_sorted_values(('a',), Number)
+        self.assertEqual(values, [1, 2.5])
+        self.assertIs(postings[0], e.index[e._hash(('a', 1))])
+
+    def test_find_operator_in_argument(self):
+        e = DSE(self.test_index())
+        with self.assertRaises(ValueError):
+            e.find({'a': {'$in': 0}})
+        with self.assertRaises(ValueError):
+            e.check_filter({'a': {'$in': 'abc'}})
+
+    def test_intersection(self):
+        self.assertEqual(_intersection([]), set())
+        a, b, c = {0, 1, 2, 3}, {1, 2}, {2, 3}
+        self.assertEqual(_intersection([a, b, c]), {2})
+        self.assertEqual(_intersection([a, set(), c]), set())
+        self.assertEqual(a, {0, 1, 2, 3})  # postings are not modified
+        e = DSE(self.test_index())
+        self.assertEqual(len(e.find({'a': 0, 'c': 'abc', 'd': {'e': True}})), 1)
+        self.assertEqual(len(e.find({'a': 1, 'b': {'$gt': 0}})), 0)
+        self.assertEqual(len(e.find({'d': {}})), 0)
+
+    def test_compact(self):
+        ti = self.test_index()
+        e = DSE(ti)
+        c = DSE(ti, compact=True)
+        self.assertEqual(len(c), len(ti))
+        self.assertEqual(set(c.find()), set(e.find()))
+        QUERIES = TEST_INDEX + [
+            {'a': 1},
+            {'a': 0, 'b': {'$gt': 0.5}},
+            {'a': {'$in': [0, 1]}},
+            {'a': {'$ne': 0}},
+            {'c': {'$lte': 'abc'}},
+            {'d': {'$exists': True}},
+            {'d': {'$exists': False}},
+            {'g': {'h': [0, 1.0, 'abc']}},
+        ]
+        for q in QUERIES:
+            self.assertEqual(set(c.find(q)), set(e.find(q)))
+        for h, posting in c.index.items():
+            self.assertEqual(c.resolve(posting), e.resolve(e.index[h]))
+        # Documents with duplicate ids are merged.
+        c = DSE(ti + ti[:2], compact=True)
+        self.assertEqual(len(c), len(ti))
+        self.assertEqual(set(c.find({'a': 0})), set(e.find({'a': 0})))
+
+    @unittest.skipIf(six.PY2, "test requires tracemalloc")
+    def test_compact_memory(self):
+        import tracemalloc
+        docs = [{'_id': str(i), 'a': i, 'b': {'c': i % 10, 'd': [i, 0]}}
+                for i in range(2000)]
+
+        def size(compact):
+            tracemalloc.start()
+            try:
+                e = DSE(docs, compact=compact)  # noqa
+                return tracemalloc.get_traced_memory()[0]
+            finally:
+                tracemalloc.stop()
+        self.assertLess(size(compact=True), 0.8 * size(compact=False))
+
+    def test_save_load(self):
+        ti = self.test_index()
+        QUERIES = TEST_INDEX + [
+            {'a': 1},
+            {'b': {'$lt': 2}},
+            {'d': {'$exists': True}},
+        ]
+        with TemporaryDirectory(prefix='signac_') as tmp_dir:
+            fn = os.path.join(tmp_dir, 'index.bin')
+            for compact in (False, True):
+                e = DSE(ti, compact=compact)
+                e.save(fn)
+                loaded = DSE.load(fn)
+                self.assertEqual(len(loaded), len(e))
+                for q in QUERIES:
+                    self.assertEqual(set(loaded.find(q)), set(e.find(q)))
+            e = DSE(ti + [{'_id': 7, 'a': True, 'b': [0, 1]}], compact=True)
+            e.save(fn)
+            loaded = DSE.load(fn)
+            for q in ({'a': {'$gt': -1}}, {'b': {'$lt': 'zzz'}}, {'b': {'$lt': 2}}):
+                self.assertEqual(set(loaded.find(q)), set(e.find(q)))
+            e = DSE(ti, include={'a': True}, hash_=json.dumps)
+            e.save(fn)
+            loaded = DSE.load(fn, hash_=json.dumps)
+            self.assertEqual(set(loaded.find({'a': 0})), set(e.find({'a': 0})))
+            with self.assertRaises(RuntimeError):
+                loaded.find({'b': 1.0})
+            with open(fn, 'wb') as file:
+                file.write(b'invalid')
+            with self.assertRaises(ValueError):
+                DSE.load(fn)
+
     def test_illegal_filters(self):
         q_invalid = [{'a': [0, {'b': 1}]}]
         q_not_indexed = {'b': 0}
@@ -113,6 +113,28 @@ class BasicShellTest(unittest.TestCase):
         self.call(['python', '-m', 'signac', 'job', '--create', '{"a": 0}'])
         self.assertTrue(os.path.isdir(wd_path))
 
+    def test_statepoint(self):
+        self.call('python -m signac init my_project'.split())
+        project = signac.Project()
+        job = project.open_job({'a': 0})
+        job.init()
+        sp = json.loads(self.call('python -m signac statepoint'.split() + [job.get_id()[:6]]))
+        self.assertEqual(sp, job.statepoint())
+        with self.assertRaises(ExitCodeError):
+            self.call('python -m signac statepoint abc'.split())
+
+    def test_statepoint_close_ids(self):
+        self.call('python -m signac init my_project'.split())
+        project = signac.Project()
+        for i in range(50):
+            project.open_job({'a': i}).init()
+        job_id = project.open_job({'a': 0}).get_id()
+        # A typo within the first character of the id.
+        typo = '{:x}'.format((int(job_id[0], 16) + 8) % 16) + job_id[1:8]
+        with self.assertRaises(ExitCodeError) as context:
+            self.call('python -m signac statepoint'.split() + [typo])
+        self.assertIn(job_id[:8], str(context.exception))
+
     def test_index(self):
         self.call('python -m signac init my_project'.split())
         project = signac.Project()